@@ -6,10 +6,17 @@ Integrates with Gemini API for personalized campaign content
 import os
 import json
 import asyncio
+import hashlib
 import logging
-from typing import Dict, List, Optional, Any
+import time
+from collections import OrderedDict, deque
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from pathlib import Path
 import re
+import string
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
@@ -21,13 +28,120 @@ except ImportError:
     genai = None
     logging.warning("Google Generative AI not available. Install with: pip install google-generativeai")
 
-import requests
-from pathlib import Path
+try:
+    from google.api_core.exceptions import ResourceExhausted
+except ImportError:
+    ResourceExhausted = None
+
+try:
+    from diskcache import Cache
+except ImportError:
+    Cache = None
+    logging.warning("diskcache not available - campaign content cache is per-process only. Install with: pip install diskcache")
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Generated content is reused for this long (aligned with market data refresh)
+CONTENT_CACHE_TTL = 30 * 60
+CONTENT_CACHE_MAX_SIZE = 256
+CONTENT_CACHE_DIR = os.getenv('CONTENT_CACHE_DIR', str(Path(__file__).parent.parent / "cache" / "campaign_content"))
+CONTENT_CACHE_SIZE_LIMIT = 200 * 1024 * 1024
+
+# Gemini quota guard (free tier allows ~15 requests per minute)
+GEMINI_MAX_CONCURRENT = 2
+GEMINI_RATE_LIMIT = 15
+GEMINI_RATE_PERIOD = 60.0
+GEMINI_DEFAULT_RETRY_DELAY = 10.0
+
+# Matches each "KEY: value" section of the AI response in a single pass; keys may carry markdown
+# or list prefixes such as "**SUBJECT:**", "1. BODY:" or "- CTA:"
+SECTION_KEY = r'^[ \t*#>\d.\-]*(?:SUBJECT|BODY|SOCIAL|CTA|BENEFITS)\**:'
+SECTION_RE = re.compile(
+    r'^[ \t*#>\d.\-]*(SUBJECT|BODY|SOCIAL|CTA|BENEFITS)\**:\**[ \t]*(.*?)(?=' + SECTION_KEY + r'|\Z)',
+    re.IGNORECASE | re.DOTALL | re.MULTILINE
+)
+
+# Per-request part of the content prompt (the static part is built once per instance)
+CONTENT_PROMPT_SUFFIX = string.Template("""
+Create a high-converting marketing campaign for upGrad's $course course targeting professionals in $city.
+
+MARKET CONTEXT:
+$market_summary
+
+KEY MARKET INSIGHTS:
+- Total positions available: $total_positions
+- Companies hiring: $companies_hiring
+- Course market score: $market_score/10
+- Growth potential: $growth_potential
+
+CAMPAIGN HOOKS TO USE:
+$campaign_hooks
+
+Current date: $current_date
+Campaign type: $campaign_type
+""")
+
+# AI responses longer than this are parsed in a worker thread
+PARSE_IN_THREAD_THRESHOLD = 4096
+
+# Performance prediction tables: columns are ctr, conversion, roas, cost
+PREDICTION_BASES = np.array([0.12, 0.05, 3.2, 300.0])
+PREDICTION_COURSE_INDEX = {'AI/ML': 0, 'Generative AI': 1, 'Data Science': 2, 'MSc Finance': 3}
+PREDICTION_MULTIPLIERS = np.array([
+    [1.4, 1.3, 1.3, 0.8],  # AI/ML
+    [1.2, 1.1, 1.1, 0.9],  # Generative AI
+    [1.1, 1.0, 1.0, 1.0],  # Data Science
+    [0.9, 0.9, 0.9, 1.1],  # MSc Finance
+])
+
+# upGrad brand guidelines (read-only)
+BRAND_GUIDELINES = MappingProxyType({
+    "brand_name": "upGrad",
+    "colors": MappingProxyType({
+        "primary": "#007BFF",
+        "secondary": "#FFFFFF",
+        "accent": "#FF6B35"
+    }),
+    "tone": "professional, motivational, career-focused",
+    "target_audience": "working professionals seeking career advancement",
+    "key_messages": (
+        "Upskill for Success",
+        "Transform Your Career",
+        "Industry-Relevant Skills",
+        "Expert-Led Learning"
+    ),
+    "content_guidelines": MappingProxyType({
+        "focus_on_career_growth": True,
+        "include_salary_benefits": True,
+        "create_urgency": True,
+        "reference_market_data": True,
+        "maintain_professional_tone": True
+    })
+})
+
+class RateLimiter:
+    """Sliding-window limiter allowing `rate` acquisitions per `period` seconds"""
+    
+    def __init__(self, rate: int, period: float):
+        self.rate = rate
+        self.period = period
+        self._timestamps = deque()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                while self._timestamps and now - self._timestamps[0] >= self.period:
+                    self._timestamps.popleft()
+                if len(self._timestamps) < self.rate:
+                    self._timestamps.append(now)
+                    return
+                await asyncio.sleep(self.period - (now - self._timestamps[0]))
+
+class InflightAbandoned(Exception):
+    """The request generating shared content was cancelled before it finished"""
+
 class AIContentGenerator:
     """
     AI-powered content generation for marketing campaigns
@@ -38,7 +152,15 @@ class AIContentGenerator:
         self.gemini_api_key = os.getenv('GEMINI_API_KEY')
         self.stability_api_key = os.getenv('STABILITY_API_KEY')
         self.model = None
-        self.brand_guidelines = self._load_brand_guidelines()
+        self.fallback_templates = self._load_fallback_templates()
+        self.prompt_prefix = self._build_prompt_prefix()
+        self._month_label_cache: Tuple[int, str] = (-1, '')
+        self._content_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+        self._disk_cache = self._open_disk_cache()
+        self._inflight: Dict[tuple, asyncio.Future] = {}
+        self._gemini_semaphore = asyncio.Semaphore(GEMINI_MAX_CONCURRENT)
+        self._gemini_limiter = RateLimiter(GEMINI_RATE_LIMIT, GEMINI_RATE_PERIOD)
+        self._gemini_waiting = 0
         self._initialize_gemini()
     
     def _initialize_gemini(self):
@@ -50,40 +172,47 @@ class AIContentGenerator:
                 self.model = genai.GenerativeModel('gemini-1.5-flash')
                 logger.info("Gemini API initialized successfully")
             except Exception as e:
-                logger.error(f"Error initializing Gemini API: {e}")
+                logger.error("Error initializing Gemini API: %s", e)
                 # Try alternative model names
                 try:
                     self.model = genai.GenerativeModel('gemini-pro')
                     logger.info("Gemini API initialized with gemini-pro")
                 except Exception as e2:
-                    logger.error(f"Error with gemini-pro: {e2}")
+                    logger.error("Error with gemini-pro: %s", e2)
                     self.model = None
         else:
             logger.warning("Gemini API not available - using fallback content generation")
     
-    def _load_brand_guidelines(self) -> Dict[str, Any]:
-        """Load upGrad brand guidelines"""
+    def _open_disk_cache(self):
+        """Open the disk-backed content cache shared across workers and restarts"""
+        if Cache is None:
+            return None
+        try:
+            return Cache(CONTENT_CACHE_DIR, size_limit=CONTENT_CACHE_SIZE_LIMIT)
+        except Exception as e:
+            logger.error("Error opening content cache at %s: %s", CONTENT_CACHE_DIR, e)
+            return None
+    
+    def _load_fallback_templates(self) -> Dict[str, Dict[str, str]]:
+        """Load fallback content templates (format strings filled per call)"""
         return {
-            "brand_name": "upGrad",
-            "colors": {
-                "primary": "#007BFF",
-                "secondary": "#FFFFFF",
-                "accent": "#FF6B35"
+            'AI/ML': {
+                'subject': "{city}'s AI Boom: {positions}+ Jobs - Upskill Now!",
+                'body': "Hey [Name], {city} is experiencing unprecedented AI/ML growth with {positions}+ positions across {companies}+ companies. Join upGrad's comprehensive {course} program and ride the wave of AI transformation. Industry experts, hands-on projects, and guaranteed career support. Limited seats - enroll today!",
+                'social': "🚀 {city} AI revolution is HERE! {positions}+ jobs, {companies}+ companies hiring. Ready to level up? #upGrad #AIJobs #{city_slug}Tech",
+                'cta': "Enroll in AI/ML Program - Limited Seats!"
             },
-            "tone": "professional, motivational, career-focused",
-            "target_audience": "working professionals seeking career advancement",
-            "key_messages": [
-                "Upskill for Success",
-                "Transform Your Career",
-                "Industry-Relevant Skills",
-                "Expert-Led Learning"
-            ],
-            "content_guidelines": {
-                "focus_on_career_growth": True,
-                "include_salary_benefits": True,
-                "create_urgency": True,
-                "reference_market_data": True,
-                "maintain_professional_tone": True
+            'Data Science': {
+                'subject': "{city} Data Gold Rush: {positions}+ Opportunities!",
+                'body': "[Name], {city}'s data landscape is exploding with {positions}+ opportunities across {companies}+ companies! Master Data Science with upGrad's industry-aligned program. Real projects, expert mentorship, and career transformation guaranteed. Your data-driven future starts now!",
+                'social': "📊 {city} needs data wizards! {positions}+ positions, {companies}+ companies. Become the data hero! #DataScience #upGrad #{city_slug}",
+                'cta': "Start Your Data Science Journey Today!"
+            },
+            'Generative AI': {
+                'subject': "{city} GenAI Boom: Create Your Future Today!",
+                'body': "Ready to shape the future, [Name]? {city}'s GenAI sector is booming with {positions}+ opportunities! Master Generative AI with upGrad and unlock unlimited potential. From ChatGPT to image generation - learn it all. Transform your career in the AI revolution!",
+                'social': "✨ GenAI is transforming {city}! Create, innovate, earn big. Join the revolution! #GenerativeAI #upGrad #{city_slug}",
+                'cta': "Master Generative AI - Enroll Now!"
             }
         }
     
@@ -95,63 +224,129 @@ class AIContentGenerator:
                                       localization_level: str = "basic") -> Dict[str, Any]:
         """Generate complete campaign content using AI"""
         
+        cache_key = (course, city, campaign_type, self._market_hash(market_context))
+        cached = self._content_cache.get(cache_key)
+        if cached is not None:
+            expires_at, cached_content = cached
+            if expires_at > time.monotonic():
+                self._content_cache.move_to_end(cache_key)
+                return dict(cached_content)
+            del self._content_cache[cache_key]
+        
+        if self._disk_cache is not None:
+            cached_content, expire_time = await asyncio.to_thread(self._disk_cache.get, cache_key, expire_time=True)
+            if cached_content is not None:
+                self._remember_content(cache_key, cached_content, ttl=expire_time - time.time())
+                return dict(cached_content)
+        
+        # Identical requests already talking to Gemini share that call's result
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            try:
+                return dict(await asyncio.shield(inflight))
+            except InflightAbandoned:
+                # Its client went away; this request is still live, so it generates the content itself
+                return await self.generate_campaign_content(
+                    course, city, campaign_type, market_context, localization_level
+                )
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
         try:
-            # Create context-aware prompt
-            prompt = self._create_content_prompt(course, city, campaign_type, market_context)
-            
-            # Generate content using Gemini or fallback
-            if self.model:
-                content = await self._generate_with_gemini(prompt)
-            else:
-                content = self._generate_fallback_content(course, city, campaign_type, market_context)
-            
-            # Parse and structure the content
-            structured_content = self._parse_ai_response(content, course, city)
-            
-            # Add performance predictions
-            structured_content['predictions'] = self._predict_performance(
-                course, city, campaign_type, market_context
+            content = await self._generate_structured_content(
+                cache_key, course, city, campaign_type, market_context
             )
-            
-            return structured_content
-            
+            future.set_result(content)
+            return dict(content)
+        except asyncio.CancelledError:
+            # Only this request was cancelled: waiters get an error they retry on, never the cancellation
+            future.set_exception(InflightAbandoned())
+            future.exception()
+            raise
         except Exception as e:
-            logger.error(f"Error generating campaign content: {e}")
-            return self._generate_fallback_content(course, city, campaign_type, market_context)
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            del self._inflight[cache_key]
     
-    def _create_content_prompt(self, 
-                             course: str, 
-                             city: str, 
-                             campaign_type: str,
-                             market_context: Dict[str, Any]) -> str:
-        """Create a comprehensive prompt for AI content generation"""
+    async def _generate_structured_content(self,
+                                         cache_key: tuple,
+                                         course: str,
+                                         city: str,
+                                         campaign_type: str,
+                                         market_context: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate, parse and cache campaign content (falls back to templates on error)"""
         
-        # Extract market insights
-        city_data = market_context.get('city_data', {})
-        course_relevance = market_context.get('course_relevance', {})
-        market_summary = market_context.get('market_summary', '')
-        campaign_hooks = market_context.get('campaign_hooks', [])
+        structured_content = None
+        if self.model:
+            try:
+                # Create context-aware prompt
+                prompt = self._create_content_prompt(course, city, campaign_type, market_context)
+                
+                # Generate content using Gemini
+                content = await self._generate_with_gemini(prompt)
+                
+                # Parse and structure the content (off the event loop for outlier long replies)
+                if len(content) > PARSE_IN_THREAD_THRESHOLD:
+                    structured_content = await asyncio.to_thread(self._parse_ai_response, content, course, city)
+                else:
+                    structured_content = self._parse_ai_response(content, course, city)
+                
+            except Exception as e:
+                logger.error("Error generating campaign content: %s", e)
         
-        prompt = f"""
-Create a high-converting marketing campaign for upGrad's {course} course targeting professionals in {city}.
-
-MARKET CONTEXT:
-{market_summary}
-
-KEY MARKET INSIGHTS:
-- Total positions available: {city_data.get('total_positions', 'N/A')}
-- Companies hiring: {city_data.get('companies_hiring', 'N/A')}
-- Course market score: {course_relevance.get('market_score', 'N/A')}/10
-- Growth potential: {course_relevance.get('growth_potential', 'Medium')}
-
-CAMPAIGN HOOKS TO USE:
-{', '.join(campaign_hooks) if campaign_hooks else 'Focus on career advancement'}
+        # Template content is never cached, so placeholder copy cannot outlive a Gemini outage
+        # or a GEMINI_API_KEY configured later
+        cacheable = structured_content is not None
+        if not cacheable:
+            structured_content = self._generate_fallback_content(course, city, campaign_type, market_context)
+        
+        # Add performance predictions
+        structured_content['predictions'] = self._predict_performance(
+            course, city, campaign_type, market_context
+        )
+        
+        if cacheable:
+            self._remember_content(cache_key, structured_content)
+            if self._disk_cache is not None:
+                await asyncio.to_thread(self._disk_cache.set, cache_key, structured_content, expire=CONTENT_CACHE_TTL)
+        
+        return structured_content
+    
+    def _market_hash(self, market_context: Dict[str, Any]) -> str:
+        """Stable hash of the market snapshot, ignoring per-call timestamps"""
+        snapshot = dict(market_context)
+        city_data = snapshot.get('city_data')
+        if isinstance(city_data, dict):
+            snapshot['city_data'] = {k: v for k, v in city_data.items() if k != 'last_updated'}
+        payload = json.dumps(snapshot, sort_keys=True, default=str).encode()
+        return hashlib.blake2b(payload, digest_size=16).hexdigest()
+    
+    def _remember_content(self, cache_key: tuple, content: Dict[str, Any], ttl: float = CONTENT_CACHE_TTL):
+        """Store content in the in-process LRU"""
+        self._content_cache[cache_key] = (time.monotonic() + ttl, content)
+        if len(self._content_cache) > CONTENT_CACHE_MAX_SIZE:
+            self._content_cache.popitem(last=False)
+    
+    def clear_content_cache(self):
+        """Drop memoized campaign content (call after market data is refreshed)"""
+        self._content_cache.clear()
+        if self._disk_cache is not None:
+            self._disk_cache.clear()
+    
+    def _build_prompt_prefix(self) -> str:
+        """Build the static part of the content prompt (brand + format instructions)"""
+        
+        return f"""
+You are writing high-converting marketing campaigns for upGrad courses.
 
 BRAND GUIDELINES:
 - Brand: upGrad
-- Tone: {self.brand_guidelines['tone']}
-- Target: {self.brand_guidelines['target_audience']}
-- Key Message: {self.brand_guidelines['key_messages'][0]}
+- Tone: {BRAND_GUIDELINES['tone']}
+- Target: {BRAND_GUIDELINES['target_audience']}
+- Key Message: {BRAND_GUIDELINES['key_messages'][0]}
 
 GENERATE THE FOLLOWING:
 
@@ -176,21 +371,79 @@ BODY: [email body]
 SOCIAL: [social media post]
 CTA: [call to action]
 BENEFITS: [benefit 1] | [benefit 2] | [benefit 3]
-
-Current date: {datetime.now().strftime('%B %Y')}
-Campaign type: {campaign_type}
 """
+    
+    def _create_content_prompt(self, 
+                             course: str, 
+                             city: str, 
+                             campaign_type: str,
+                             market_context: Dict[str, Any]) -> Tuple[str, str]:
+        """Create the prompt for AI content generation as (static prefix, dynamic suffix)"""
         
-        return prompt
+        # Extract market insights
+        city_data = market_context.get('city_data', {})
+        course_relevance = market_context.get('course_relevance', {})
+        market_summary = market_context.get('market_summary', '')
+        campaign_hooks = market_context.get('campaign_hooks', [])
+        
+        suffix = CONTENT_PROMPT_SUFFIX.substitute(
+            course=course,
+            city=city,
+            market_summary=market_summary,
+            total_positions=city_data.get('total_positions', 'N/A'),
+            companies_hiring=city_data.get('companies_hiring', 'N/A'),
+            market_score=course_relevance.get('market_score', 'N/A'),
+            growth_potential=course_relevance.get('growth_potential', 'Medium'),
+            campaign_hooks=', '.join(campaign_hooks) if campaign_hooks else 'Focus on career advancement',
+            current_date=self._current_month_label(),
+            campaign_type=campaign_type
+        )
+        
+        return self.prompt_prefix, suffix
+    
+    def _current_month_label(self) -> str:
+        """Current "Month YYYY" label, recomputed at most once a minute"""
+        minute = int(time.time() // 60)
+        if self._month_label_cache[0] != minute:
+            self._month_label_cache = (minute, datetime.now().strftime('%B %Y'))
+        return self._month_label_cache[1]
     
-    async def _generate_with_gemini(self, prompt: str) -> str:
-        """Generate content using Gemini API"""
+    async def _generate_with_gemini(self, prompt: Tuple[str, str]) -> str:
+        """Generate content using Gemini API, within the request quota"""
+        self._gemini_waiting += 1
+        if self._gemini_waiting > GEMINI_MAX_CONCURRENT:
+            logger.info("Gemini requests queued: %s", self._gemini_waiting)
         try:
-            response = self.model.generate_content(prompt)
-            return response.text
+            async with self._gemini_semaphore:
+                await self._gemini_limiter.acquire()
+                try:
+                    return await self._call_gemini(prompt)
+                except Exception as e:
+                    if ResourceExhausted is None or not isinstance(e, ResourceExhausted):
+                        raise
+                    delay = self._get_retry_delay(e)
+                    logger.warning("Gemini quota exhausted, retrying in %.0fs", delay)
+                    await asyncio.sleep(delay)
+                    return await self._call_gemini(prompt)
         except Exception as e:
-            logger.error(f"Gemini API error: {e}")
+            logger.error("Gemini API error: %s", e)
             raise
+        finally:
+            self._gemini_waiting -= 1
+    
+    async def _call_gemini(self, prompt: Tuple[str, str]) -> str:
+        """Single Gemini request"""
+        # Static prefix goes first so the provider can reuse it across calls
+        response = await self.model.generate_content_async(list(prompt))
+        return response.text
+    
+    def _get_retry_delay(self, error: Exception) -> float:
+        """Read the server-suggested retry delay from a quota error"""
+        for detail in getattr(error, 'details', None) or []:
+            retry_delay = getattr(detail, 'retry_delay', None)
+            if retry_delay is not None:
+                return retry_delay.seconds + retry_delay.nanos / 1e9
+        return GEMINI_DEFAULT_RETRY_DELAY
     
     def _generate_fallback_content(self, 
                                  course: str, 
@@ -203,34 +456,19 @@ Campaign type: {campaign_type}
         positions = city_data.get('total_positions', 1000)
         companies = city_data.get('companies_hiring', 50)
         
-        # Template-based content generation
-        templates = {
-            'AI/ML': {
-                'subject': f"{city}'s AI Boom: {positions}+ Jobs - Upskill Now!",
-                'body': f"Hey [Name], {city} is experiencing unprecedented AI/ML growth with {positions}+ positions across {companies}+ companies. Join upGrad's comprehensive {course} program and ride the wave of AI transformation. Industry experts, hands-on projects, and guaranteed career support. Limited seats - enroll today!",
-                'social': f"🚀 {city} AI revolution is HERE! {positions}+ jobs, {companies}+ companies hiring. Ready to level up? #upGrad #AIJobs #{city.replace(' ', '')}Tech",
-                'cta': "Enroll in AI/ML Program - Limited Seats!"
-            },
-            'Data Science': {
-                'subject': f"{city} Data Gold Rush: {positions}+ Opportunities!",
-                'body': f"[Name], {city}'s data landscape is exploding with {positions}+ opportunities across {companies}+ companies! Master Data Science with upGrad's industry-aligned program. Real projects, expert mentorship, and career transformation guaranteed. Your data-driven future starts now!",
-                'social': f"📊 {city} needs data wizards! {positions}+ positions, {companies}+ companies. Become the data hero! #DataScience #upGrad #{city.replace(' ', '')}",
-                'cta': "Start Your Data Science Journey Today!"
-            },
-            'Generative AI': {
-                'subject': f"{city} GenAI Boom: Create Your Future Today!",
-                'body': f"Ready to shape the future, [Name]? {city}'s GenAI sector is booming with {positions}+ opportunities! Master Generative AI with upGrad and unlock unlimited potential. From ChatGPT to image generation - learn it all. Transform your career in the AI revolution!",
-                'social': f"✨ GenAI is transforming {city}! Create, innovate, earn big. Join the revolution! #GenerativeAI #upGrad #{city.replace(' ', '')}",
-                'cta': "Master Generative AI - Enroll Now!"
-            }
+        template = self.fallback_templates.get(course, self.fallback_templates['AI/ML'])
+        values = {
+            'city': city,
+            'city_slug': city.replace(' ', ''),
+            'course': course,
+            'positions': positions,
+            'companies': companies
         }
         
-        template = templates.get(course, templates['AI/ML'])
-        
         return {
-            'email_subject': template['subject'],
-            'email_body': template['body'],
-            'social_post': template['social'],
+            'email_subject': template['subject'].format_map(values),
+            'email_body': template['body'].format_map(values),
+            'social_post': template['social'].format_map(values),
             'call_to_action': template['cta'],
             'key_benefits': [
                 f"Access to {positions}+ job opportunities",
@@ -239,27 +477,25 @@ Campaign type: {campaign_type}
             ]
         }
     
-    def _parse_ai_response(self, ai_response: str, course: str, city: str) -> Dict[str, Any]:
-        """Parse AI response into structured format"""
+    def _parse_ai_response(self, ai_response: str, course: str, city: str) -> Optional[Dict[str, Any]]:
+        """Parse AI response into structured format (None if it cannot be parsed)"""
         
         try:
-            # Extract components using regex
-            subject_match = re.search(r'SUBJECT:\s*(.+)', ai_response, re.IGNORECASE)
-            body_match = re.search(r'BODY:\s*(.+?)(?=SOCIAL:|$)', ai_response, re.IGNORECASE | re.DOTALL)
-            social_match = re.search(r'SOCIAL:\s*(.+?)(?=CTA:|$)', ai_response, re.IGNORECASE)
-            cta_match = re.search(r'CTA:\s*(.+?)(?=BENEFITS:|$)', ai_response, re.IGNORECASE)
-            benefits_match = re.search(r'BENEFITS:\s*(.+)', ai_response, re.IGNORECASE)
+            # Extract all sections in one scan; first occurrence of a key wins
+            sections = {}
+            for match in SECTION_RE.finditer(ai_response):
+                sections.setdefault(match.group(1).upper(), match.group(2).strip())
             
             # Extract and clean content
-            email_subject = subject_match.group(1).strip() if subject_match else f"{city} {course} Opportunity - Transform Your Career!"
-            email_body = body_match.group(1).strip() if body_match else f"Exciting {course} opportunities in {city}. Join upGrad today!"
-            social_post = social_match.group(1).strip() if social_match else f"🚀 {course} opportunities in {city}! #upGrad"
-            call_to_action = cta_match.group(1).strip() if cta_match else "Enroll Now - Limited Seats!"
+            email_subject = sections['SUBJECT'].split('\n', 1)[0] if sections.get('SUBJECT') else f"{city} {course} Opportunity - Transform Your Career!"
+            email_body = sections.get('BODY') or f"Exciting {course} opportunities in {city}. Join upGrad today!"
+            social_post = sections.get('SOCIAL') or f"🚀 {course} opportunities in {city}! #upGrad"
+            call_to_action = sections.get('CTA') or "Enroll Now - Limited Seats!"
             
             # Parse benefits
             benefits = []
-            if benefits_match:
-                benefits_text = benefits_match.group(1).strip()
+            if sections.get('BENEFITS'):
+                benefits_text = sections['BENEFITS'].split('\n', 1)[0]
                 benefits = [b.strip() for b in benefits_text.split('|')]
             else:
                 benefits = ["Career advancement", "Salary increase", "Industry recognition"]
@@ -273,9 +509,9 @@ Campaign type: {campaign_type}
             }
             
         except Exception as e:
-            logger.error(f"Error parsing AI response: {e}")
-            # Return fallback content
-            return self._generate_fallback_content(course, city, "Email", {})
+            logger.error("Error parsing AI response: %s", e)
+            # The caller falls back to template content built from the real market context
+            return None
     
     def _predict_performance(self, 
                            course: str, 
@@ -284,33 +520,19 @@ Campaign type: {campaign_type}
                            market_context: Dict[str, Any]) -> Dict[str, str]:
         """Predict campaign performance based on market context"""
         
-        # Base performance metrics
-        base_ctr = 0.12
-        base_conversion = 0.05
-        base_roas = 3.2
-        base_cost = 300
-        
-        # Course multipliers
-        course_multipliers = {
-            'AI/ML': {'ctr': 1.4, 'conversion': 1.3, 'roas': 1.3, 'cost': 0.8},
-            'Generative AI': {'ctr': 1.2, 'conversion': 1.1, 'roas': 1.1, 'cost': 0.9},
-            'Data Science': {'ctr': 1.1, 'conversion': 1.0, 'roas': 1.0, 'cost': 1.0},
-            'MSc Finance': {'ctr': 0.9, 'conversion': 0.9, 'roas': 0.9, 'cost': 1.1}
-        }
-        
-        # Get course multiplier
-        multiplier = course_multipliers.get(course, course_multipliers['Data Science'])
+        # Course multipliers (default to Data Science row)
+        multiplier = PREDICTION_MULTIPLIERS[PREDICTION_COURSE_INDEX.get(course, 2)]
         
         # Apply market context boost
         city_data = market_context.get('city_data', {})
         market_score = city_data.get('market_score', 5)
         market_boost = 1 + (market_score / 20)  # 5% boost per market score point
         
-        # Calculate final metrics
-        final_ctr = base_ctr * multiplier['ctr'] * market_boost
-        final_conversion = base_conversion * multiplier['conversion'] * market_boost
-        final_roas = base_roas * multiplier['roas'] * market_boost
-        final_cost = base_cost * multiplier['cost'] / market_boost
+        # Calculate final metrics: ctr, conversion, roas scale up, cost scales down
+        final = PREDICTION_BASES * multiplier
+        final[:3] *= market_boost
+        final[3] /= market_boost
+        final_ctr, final_conversion, final_roas, final_cost = final.tolist()
         
         return {
             'ctr': f"{final_ctr * 100:.1f}%",
@@ -341,5 +563,3 @@ Quality: High resolution, marketing-ready, professional photography style
         
         return prompt
 
-# Global instance
-ai_content_generator = AIContentGenerator()
@@ -3,37 +3,180 @@ FastAPI Server for upGrad AI Marketing Automation System
 Main application with REST endpoints
 """
 
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI, HTTPException, Request, Depends, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, Response, JSONResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
 import json
 import logging
+import logging.config
+import os
+import re
 from pathlib import Path
 import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from datetime import datetime
 
+import anyio
+
+# Configure logging once for the whole backend (modules only create loggers)
+logging.config.dictConfig({
+    "version": 1,
+    "disable_existing_loggers": False,
+    "formatters": {
+        "default": {"format": "%(asctime)s - %(name)s - %(levelname)s - %(message)s"}
+    },
+    "handlers": {
+        "console": {"class": "logging.StreamHandler", "formatter": "default"}
+    },
+    "root": {"level": os.getenv("LOG_LEVEL", "INFO").upper(), "handlers": ["console"]}
+})
+
+try:
+    import orjson
+    
+    def _json_dumps(payload: Any) -> bytes:
+        # Market data and predictions carry numpy scalars from pandas
+        return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    orjson = None
+    
+    def _json_default(value: Any) -> Any:
+        """Convert numpy scalars and arrays, which the stdlib encoder rejects"""
+        if hasattr(value, 'tolist'):
+            return value.tolist()
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+    
+    def _json_dumps(payload: Any) -> bytes:
+        return json.dumps(payload, separators=(",", ":"), default=_json_default).encode()
+    logging.warning("orjson not available - using standard json. Install with: pip install orjson")
+
+# Response class used for the app default and for responses built by hand
+APIResponse = ORJSONResponse if orjson else JSONResponse
+
 # Import our custom modules
 from .market_intel import market_intelligence
-from .ai_engine import ai_content_generator
+from .ai_engine import AIContentGenerator
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Response timestamps only need second granularity, so one clock read per second is shared
+CLOCK_TICK_SECONDS = 1.0
+_now_iso = datetime.now().isoformat()
+
+async def _tick_clock():
+    """Refresh the shared response timestamp once per tick"""
+    global _now_iso
+    while True:
+        _now_iso = datetime.now().isoformat()
+        await asyncio.sleep(CLOCK_TICK_SECONDS)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize services on startup"""
+    logger.info("🚀 Starting upGrad AI Marketing Automation System")
+    logger.info("📊 Market Intelligence Engine: Ready")
+    
+    # One content generator per worker; its Gemini model handle is built here, before the first
+    # request, without a network call
+    app.state.ai = AIContentGenerator()
+    logger.info("🤖 AI Content Generator: Ready") 
+    logger.info("📈 Performance Analytics: Ready")
+    logger.info("✅ All systems operational")
+    clock_task = asyncio.create_task(_tick_clock())
+    market_update_task = asyncio.create_task(_publish_market_updates())
+    try:
+        yield
+    finally:
+        clock_task.cancel()
+        market_update_task.cancel()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="upGrad AI Marketing Automation",
     description="AI-powered marketing campaign generation with real market intelligence",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=APIResponse
 )
 
+def get_ai(request: Request) -> AIContentGenerator:
+    """Content generator created in the lifespan handler"""
+    return request.app.state.ai
+
+# Pending dashboard updates kept per client before a slow client starts dropping them
+WS_QUEUE_MAX_SIZE = 32
+
+class Broadcaster:
+    """Fan-out of dashboard updates to connected WebSocket clients"""
+    
+    def __init__(self):
+        self.subscribers = set()
+    
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=WS_QUEUE_MAX_SIZE)
+        self.subscribers.add(queue)
+        return queue
+    
+    def unsubscribe(self, queue: asyncio.Queue):
+        self.subscribers.discard(queue)
+    
+    def publish(self, message: Dict[str, Any]):
+        """Encode the update once and queue it for every subscriber"""
+        if not self.subscribers:
+            return
+        payload = _json_dumps(message).decode()
+        for queue in self.subscribers:
+            try:
+                queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                logger.warning("Dropping dashboard update for slow WebSocket client")
+
+broadcaster = Broadcaster()
+
+# Periodic dashboard summary pushed to every WebSocket client
+MARKET_UPDATE_INTERVAL = 30.0
+
+async def _publish_market_updates():
+    """Publish the dashboard summary once per interval; it is encoded once for all clients"""
+    while True:
+        await asyncio.sleep(MARKET_UPDATE_INTERVAL)
+        broadcaster.publish({
+            "type": "market_update",
+            "timestamp": _now_iso,
+            "data": {
+                "active_campaigns": 24,
+                "new_opportunities": 156,
+                "performance_score": 87
+            }
+        })
+
+# Static asset mounts are same-origin dashboard fetches and never need CORS
+STATIC_PATH_PREFIXES = ("/static", "/MI", "/backend")
+
+# Comma-separated list of origins allowed to call the API cross-origin
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:8000,http://127.0.0.1:8000").split(",")
+    if origin.strip()
+]
+
+class StaticBypassCORSMiddleware(CORSMiddleware):
+    """CORS middleware that passes static asset requests straight through"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(STATIC_PATH_PREFIXES):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
 # Add CORS middleware
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
+    StaticBypassCORSMiddleware,
+    allow_origins=CORS_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -53,17 +196,123 @@ class CampaignResponse(BaseModel):
     market_context: Dict[str, Any]
     image_url: Optional[str] = None
 
+# Fingerprinted assets (e.g. app.3f9a1c2b.js) never change under the same name
+HASHED_ASSET_RE = re.compile(r"\.[0-9a-f]{8,}\.[A-Za-z0-9]+$")
+STATIC_MAX_AGE = 86400
+
+# Dashboard assets up to this size are kept in memory after the first read
+STATIC_MEMORY_MAX_FILE_SIZE = 64 * 1024
+STATIC_MEMORY_CACHE_SIZE = 128
+
+_static_memory_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+
+class MemoryFileResponse(FileResponse):
+    """FileResponse that serves small static files from an in-process LRU"""
+    
+    async def __call__(self, scope, receive, send):
+        # mtime and size are part of the key so edited files are re-read
+        key = (self.path, self.stat_result.st_mtime_ns, self.stat_result.st_size)
+        body = _static_memory_cache.get(key)
+        if body is None:
+            body = await anyio.Path(self.path).read_bytes()
+            _static_memory_cache[key] = body
+            if len(_static_memory_cache) > STATIC_MEMORY_CACHE_SIZE:
+                _static_memory_cache.popitem(last=False)
+        else:
+            _static_memory_cache.move_to_end(key)
+        
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        await send({"type": "http.response.body", "body": b"" if self.send_header_only else body})
+        if self.background is not None:
+            await self.background()
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles with browser caching headers (ETag/304 handling comes from Starlette)"""
+    
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if isinstance(response, FileResponse) and stat_result.st_size <= STATIC_MEMORY_MAX_FILE_SIZE:
+            response = MemoryFileResponse(
+                full_path, status_code=status_code, stat_result=stat_result, method=scope["method"]
+            )
+        path = str(full_path)
+        if path.endswith(".html"):
+            # Always revalidate pages so new asset references are picked up
+            response.headers["Cache-Control"] = "no-cache"
+        elif HASHED_ASSET_RE.search(path):
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE * 365}, immutable"
+        else:
+            response.headers["Cache-Control"] = f"public, max-age={STATIC_MAX_AGE}"
+        return response
+
 # Mount static files (frontend)
 static_path = Path(__file__).parent.parent / "MI"
 backend_path = Path(__file__).parent
 if static_path.exists():
-    app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+    app.mount("/static", CachedStaticFiles(directory=str(static_path)), name="static")
     # Also mount the MI directory directly for CSS/JS files
-    app.mount("/MI", StaticFiles(directory=str(static_path)), name="frontend")
+    app.mount("/MI", CachedStaticFiles(directory=str(static_path)), name="frontend")
     # Mount backend directory for dashboard_connector.js
-    app.mount("/backend", StaticFiles(directory=str(backend_path)), name="backend")
-    logger.info(f"Mounted static files from: {static_path}")
-    logger.info(f"Mounted backend files from: {backend_path}")
+    app.mount("/backend", CachedStaticFiles(directory=str(backend_path)), name="backend")
+    logger.info("Mounted static files from: %s", static_path)
+    logger.info("Mounted backend files from: %s", backend_path)
+
+# Static payloads are encoded once; only the timestamp is appended per request
+HEALTH_STATUS = {
+    "status": "healthy",
+    "version": "1.0.0",
+    "services": {
+        "market_intelligence": "active",
+        "ai_content_generator": "active",
+        "database": "active"
+    }
+}
+
+PERFORMANCE_ANALYTICS_SAMPLE = {
+    "platform_performance": {
+        "Facebook": {"ctr": 0.025, "conversion_rate": 0.045, "roas": 3.2},
+        "Instagram": {"ctr": 0.047, "conversion_rate": 0.085, "roas": 4.8},
+        "LinkedIn": {"ctr": 0.032, "conversion_rate": 0.062, "roas": 4.1},
+        "Twitter": {"ctr": 0.018, "conversion_rate": 0.028, "roas": 2.8},
+        "YouTube": {"ctr": 0.041, "conversion_rate": 0.071, "roas": 4.5},
+        "Google Ads": {"ctr": 0.038, "conversion_rate": 0.068, "roas": 4.2}
+    },
+    "city_performance": {
+        "Bangalore": {"performance_score": 8.33},
+        "Mumbai": {"performance_score": 7.89},
+        "Delhi NCR": {"performance_score": 7.95},
+        "Hyderabad": {"performance_score": 8.41},
+        "Chennai": {"performance_score": 8.12},
+        "Pune": {"performance_score": 7.76}
+    },
+    "content_themes": {
+        "Job Security": {"performance_score": 8.35},
+        "Career Growth": {"performance_score": 8.12},
+        "Salary Boost": {"performance_score": 7.98},
+        "Skill Development": {"performance_score": 7.85}
+    },
+    "campaign_metrics": {
+        "total_campaigns": 24,
+        "active_markets": 8,
+        "ai_optimization_score": 87,
+        "current_roi": 4.2
+    }
+}
+
+def _encode_json_prefix(payload: Dict[str, Any]) -> bytes:
+    """Encode a payload as JSON with the closing brace left off"""
+    return _json_dumps(payload)[:-1]
+
+def _json_response_with_timestamp(prefix: bytes, timestamp: str) -> Response:
+    """Close a pre-encoded JSON object with the given timestamp"""
+    body = prefix + b',"timestamp":"' + timestamp.encode() + b'"}'
+    return Response(content=body, media_type="application/json")
+
+_HEALTH_PREFIX = _encode_json_prefix(HEALTH_STATUS)
+_PERFORMANCE_ANALYTICS_PREFIX = _encode_json_prefix({
+    "status": "success",
+    "data": PERFORMANCE_ANALYTICS_SAMPLE
+})
 
 # Root endpoint - serve the main dashboard
 @app.get("/", response_class=HTMLResponse)
@@ -72,7 +321,7 @@ async def root():
     try:
         html_file = Path(__file__).parent.parent / "MI" / "index.html"
         if html_file.exists():
-            return FileResponse(html_file)
+            return FileResponse(html_file, headers={"Cache-Control": "no-cache"})
         else:
             return HTMLResponse("""
             <html>
@@ -90,23 +339,15 @@ async def root():
             </html>
             """)
     except Exception as e:
-        logger.error(f"Error serving root: {e}")
+        logger.error("Error serving root: %s", e)
         raise HTTPException(status_code=500, detail="Error loading dashboard")
 
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0",
-        "services": {
-            "market_intelligence": "active",
-            "ai_content_generator": "active",
-            "database": "active"
-        }
-    }
+    # Health checks keep a precise timestamp
+    return _json_response_with_timestamp(_HEALTH_PREFIX, datetime.now().isoformat())
 
 # Market Intelligence endpoints
 @app.get("/api/market-intelligence")
@@ -117,10 +358,10 @@ async def get_market_intelligence():
         return {
             "status": "success",
             "data": trends,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso
         }
     except Exception as e:
-        logger.error(f"Error getting market intelligence: {e}")
+        logger.error("Error getting market intelligence: %s", e)
         raise HTTPException(status_code=500, detail="Error retrieving market data")
 
 @app.get("/api/city-insights/{city}")
@@ -134,12 +375,12 @@ async def get_city_insights(city: str):
         return {
             "status": "success",
             "data": insights,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso
         }
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error getting city insights: {e}")
+        logger.error("Error getting city insights: %s", e)
         raise HTTPException(status_code=500, detail="Error retrieving city data")
 
 @app.get("/api/skill-demand")
@@ -150,10 +391,10 @@ async def get_skill_demand():
         return {
             "status": "success",
             "data": skill_demand,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso
         }
     except Exception as e:
-        logger.error(f"Error getting skill demand: {e}")
+        logger.error("Error getting skill demand: %s", e)
         raise HTTPException(status_code=500, detail="Error retrieving skill data")
 
 @app.get("/api/course-relevance/{course}")
@@ -164,18 +405,18 @@ async def get_course_relevance(course: str):
         return {
             "status": "success",
             "data": relevance,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso
         }
     except Exception as e:
-        logger.error(f"Error getting course relevance: {e}")
+        logger.error("Error getting course relevance: %s", e)
         raise HTTPException(status_code=500, detail="Error retrieving course data")
 
 # Campaign Generation endpoints
 @app.post("/api/generate-campaign")
-async def generate_campaign(request: CampaignRequest):
+async def generate_campaign(request: CampaignRequest, ai_content_generator: AIContentGenerator = Depends(get_ai)):
     """Generate AI-powered marketing campaign"""
     try:
-        logger.info(f"Generating campaign for {request.course} in {request.city}")
+        logger.info("Generating campaign for %s in %s", request.course, request.city)
         
         # Get market context
         market_context = market_intelligence.get_market_context(
@@ -208,7 +449,7 @@ async def generate_campaign(request: CampaignRequest):
                 # This would integrate with image generation service
                 image_url = "/static/images/default_campaign.png"
             except Exception as e:
-                logger.warning(f"Image generation failed: {e}")
+                logger.warning("Image generation failed: %s", e)
         
         response = CampaignResponse(
             content=content,
@@ -217,14 +458,26 @@ async def generate_campaign(request: CampaignRequest):
             image_url=image_url
         )
         
-        return {
+        broadcaster.publish({
+            "type": "campaign_generated",
+            "timestamp": _now_iso,
+            "data": {
+                "course": request.course,
+                "city": request.city,
+                "campaign_type": request.campaign_type,
+                "predictions": response.predictions
+            }
+        })
+        
+        # Encoded by hand so the large payload skips jsonable_encoder; _json_dumps handles numpy values
+        return Response(content=_json_dumps({
             "status": "success",
-            "data": response.dict(),
-            "timestamp": datetime.now().isoformat()
-        }
+            "data": response.model_dump(),
+            "timestamp": _now_iso
+        }), media_type="application/json")
         
     except Exception as e:
-        logger.error(f"Error generating campaign: {e}")
+        logger.error("Error generating campaign: %s", e)
         raise HTTPException(status_code=500, detail=f"Error generating campaign: {str(e)}")
 
 # Performance Analytics endpoints
@@ -233,47 +486,11 @@ async def get_performance_analytics():
     """Get campaign performance data for charts and analytics"""
     try:
         # This would typically load from the marketing automation Excel file
-        # For now, return sample data structure
-        
-        sample_data = {
-            "platform_performance": {
-                "Facebook": {"ctr": 0.025, "conversion_rate": 0.045, "roas": 3.2},
-                "Instagram": {"ctr": 0.047, "conversion_rate": 0.085, "roas": 4.8},
-                "LinkedIn": {"ctr": 0.032, "conversion_rate": 0.062, "roas": 4.1},
-                "Twitter": {"ctr": 0.018, "conversion_rate": 0.028, "roas": 2.8},
-                "YouTube": {"ctr": 0.041, "conversion_rate": 0.071, "roas": 4.5},
-                "Google Ads": {"ctr": 0.038, "conversion_rate": 0.068, "roas": 4.2}
-            },
-            "city_performance": {
-                "Bangalore": {"performance_score": 8.33},
-                "Mumbai": {"performance_score": 7.89},
-                "Delhi NCR": {"performance_score": 7.95},
-                "Hyderabad": {"performance_score": 8.41},
-                "Chennai": {"performance_score": 8.12},
-                "Pune": {"performance_score": 7.76}
-            },
-            "content_themes": {
-                "Job Security": {"performance_score": 8.35},
-                "Career Growth": {"performance_score": 8.12},
-                "Salary Boost": {"performance_score": 7.98},
-                "Skill Development": {"performance_score": 7.85}
-            },
-            "campaign_metrics": {
-                "total_campaigns": 24,
-                "active_markets": 8,
-                "ai_optimization_score": 87,
-                "current_roi": 4.2
-            }
-        }
-        
-        return {
-            "status": "success",
-            "data": sample_data,
-            "timestamp": datetime.now().isoformat()
-        }
+        # For now, return the pre-encoded sample data structure
+        return _json_response_with_timestamp(_PERFORMANCE_ANALYTICS_PREFIX, _now_iso)
         
     except Exception as e:
-        logger.error(f"Error getting performance analytics: {e}")
+        logger.error("Error getting performance analytics: %s", e)
         raise HTTPException(status_code=500, detail="Error retrieving analytics data")
 
 # Export endpoints
@@ -289,66 +506,64 @@ async def export_data(format: str):
             "status": "success",
             "message": f"Export in {format} format initiated",
             "download_url": f"/api/download/campaign_data.{format}",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Error exporting data: {e}")
+        logger.error("Error exporting data: %s", e)
         raise HTTPException(status_code=500, detail="Error exporting data")
 
 # WebSocket endpoint for real-time updates
 @app.websocket("/ws")
-async def websocket_endpoint(websocket):
+async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time dashboard updates"""
     await websocket.accept()
+    queue = broadcaster.subscribe()
+    # Reading the socket is what notices a disconnect while no updates are flowing
+    receiver = asyncio.create_task(_wait_for_disconnect(websocket))
     try:
         while True:
-            # Send periodic updates
-            update_data = {
-                "type": "market_update",
-                "timestamp": datetime.now().isoformat(),
-                "data": {
-                    "active_campaigns": 24,
-                    "new_opportunities": 156,
-                    "performance_score": 87
-                }
-            }
-            await websocket.send_json(update_data)
-            await asyncio.sleep(30)  # Update every 30 seconds
+            # Updates are pushed by the endpoints and tasks that produce them
+            getter = asyncio.create_task(queue.get())
+            done, _ = await asyncio.wait({receiver, getter}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                break
+            await websocket.send_text(getter.result())
             
+    except WebSocketDisconnect:
+        pass
     except Exception as e:
-        logger.error(f"WebSocket error: {e}")
+        logger.error("WebSocket error: %s", e)
     finally:
-        await websocket.close()
+        receiver.cancel()
+        broadcaster.unsubscribe(queue)
+
+async def _wait_for_disconnect(websocket: WebSocket):
+    """Consume (and ignore) client messages until the client disconnects"""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
 
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request: Request, exc: HTTPException):
-    return {
+    return APIResponse({
         "status": "error",
         "message": "Endpoint not found",
-        "timestamp": datetime.now().isoformat()
-    }
+        "timestamp": _now_iso
+    }, status_code=404)
 
 @app.exception_handler(500)
 async def internal_error_handler(request: Request, exc: HTTPException):
-    return {
+    return APIResponse({
         "status": "error", 
         "message": "Internal server error",
-        "timestamp": datetime.now().isoformat()
-    }
-
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """Initialize services on startup"""
-    logger.info("🚀 Starting upGrad AI Marketing Automation System")
-    logger.info("📊 Market Intelligence Engine: Ready")
-    logger.info("🤖 AI Content Generator: Ready") 
-    logger.info("📈 Performance Analytics: Ready")
-    logger.info("✅ All systems operational")
+        "timestamp": _now_iso
+    }, status_code=500)
 
 if __name__ == "__main__":
     import uvicorn
@@ -4,26 +4,114 @@ Integrates with Stable Diffusion API for branded campaign visuals
 """
 
 import os
-import requests
+import importlib.metadata
+import importlib.util
 import logging
-from typing import Dict, List, Optional, Any
+from types import MappingProxyType
+from typing import Dict, List, Optional, Any, TYPE_CHECKING
 from datetime import datetime
+import time
 from pathlib import Path
 import base64
+import hashlib
 import json
 import asyncio
-import aiohttp
-from PIL import Image, ImageDraw, ImageFont
 import io
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+import shutil
+from functools import lru_cache
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+# PIL and aiohttp are imported lazily in the methods that need them so that
+# importing this module stays cheap for requests that never render images
+if TYPE_CHECKING:
+    import aiohttp
+    from PIL import Image, ImageFont
+
 logger = logging.getLogger(__name__)
 
+# upGrad brand guidelines for image generation (read-only)
+BRAND_GUIDELINES = MappingProxyType({
+    "colors": MappingProxyType({
+        "primary": "#007BFF",
+        "secondary": "#FFFFFF",
+        "accent": "#FF6B35",
+        "success": "#28A745",
+        "warning": "#FFC107"
+    }),
+    "fonts": ("Inter", "Arial", "Helvetica"),
+    "logo_requirements": MappingProxyType({
+        "position": "top-right or bottom-right",
+        "size": "prominent but not overwhelming",
+        "background": "ensure good contrast"
+    }),
+    "style_guidelines": MappingProxyType({
+        "mood": "professional, motivational, aspirational",
+        "setting": "modern office, Indian professionals",
+        "quality": "high resolution, marketing ready",
+        "avoid": "cluttered, unprofessional, low quality"
+    })
+})
+
+# Template background gradient as (position, brand colour) stops, top to bottom
+TEMPLATE_GRADIENT_STOPS = (
+    (0.0, "primary"),
+    (1.0, "accent")
+)
+
+# Output size and format for each social media platform
+PLATFORM_SPECS = MappingProxyType({
+    "facebook": {"size": (1200, 630), "format": "JPEG"},
+    "instagram": {"size": (1080, 1080), "format": "JPEG"},
+    "linkedin": {"size": (1200, 627), "format": "PNG"},
+    "twitter": {"size": (1200, 675), "format": "JPEG"},
+    "youtube": {"size": (1280, 720), "format": "JPEG"}
+})
+
+# Cached Stability AI renders are reused for this long (seconds)
+STABILITY_CACHE_TTL = 7 * 24 * 3600
+
+# Stability AI requests allowed in flight at once (bursts beyond this queue up)
+STABILITY_MAX_CONCURRENT = 4
+
+# Read size when streaming API responses to disk
+STREAM_CHUNK_SIZE = 64 * 1024
+
+def _link_or_copy(source, destination):
+    """Hardlink a file, copying the bytes only when linking is not possible"""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+@lru_cache(maxsize=64)
+def _get_font(name: str, size: int) -> "ImageFont.FreeTypeFont":
+    """Load a TrueType font once per (name, size), falling back to PIL's default"""
+    from PIL import ImageFont
+    
+    try:
+        return ImageFont.truetype(name, size=size)
+    except OSError:
+        return ImageFont.load_default()
+
+@lru_cache(maxsize=256)
+def _text_width(text: str, font_name: str, size: int) -> int:
+    """Rendered width of text in a cached font; fixed strings and repeat courses skip re-shaping"""
+    bbox = _get_font(font_name, size).getbbox(text)
+    return bbox[2] - bbox[0]
+
+# zlib levels for PNG output (PNG ignores "quality"); intermediates favour speed
+INTERMEDIATE_PNG_COMPRESS_LEVEL = 1
+FINAL_PNG_COMPRESS_LEVEL = 6
+
+# PIL releases the GIL in its C code, so a few threads render images in parallel
+IMAGE_MAX_WORKERS = 4
+
 class ImageGenerator:
     """
     AI-powered image generation for marketing campaigns
@@ -33,34 +121,30 @@ class ImageGenerator:
     def __init__(self):
         self.stability_api_key = os.getenv('STABILITY_API_KEY')
         self.base_url = "https://api.stability.ai/v2beta/stable-image/generate"
-        self.brand_guidelines = self._load_brand_guidelines()
         self.output_dir = Path("main idea/MI/images")
         self.output_dir.mkdir(exist_ok=True)
+        self._session: Optional["aiohttp.ClientSession"] = None
+        self._stability_semaphore: Optional[asyncio.Semaphore] = None
+        self._executor = ThreadPoolExecutor(max_workers=IMAGE_MAX_WORKERS, thread_name_prefix="image")
+        
+        # Brand colours parsed once; PIL would re-parse hex strings on every draw call
+        self._primary_rgb = self._hex_to_rgb(BRAND_GUIDELINES['colors']['primary'])
+        self._accent_rgb = self._hex_to_rgb(BRAND_GUIDELINES['colors']['accent'])
+        self._white_rgb = self._hex_to_rgb(BRAND_GUIDELINES['colors']['secondary'])
+        self._gradient_positions = np.array([position for position, _ in TEMPLATE_GRADIENT_STOPS], dtype=np.float64)
+        self._gradient_colors = np.array(
+            [self._hex_to_rgb(BRAND_GUIDELINES['colors'][name]) for _, name in TEMPLATE_GRADIENT_STOPS],
+            dtype=np.float64
+        )
+        
+        if importlib.util.find_spec("PIL") is None:
+            logger.warning("Pillow not available - image templates and overlays disabled. Install with: pip install Pillow")
+        else:
+            try:
+                logger.info("Using Pillow-SIMD %s for image resizing", importlib.metadata.version("Pillow-SIMD"))
+            except importlib.metadata.PackageNotFoundError:
+                logger.info("Using stock Pillow - install Pillow-SIMD for faster resizing")
         
-    def _load_brand_guidelines(self) -> Dict[str, Any]:
-        """Load upGrad brand guidelines for image generation"""
-        return {
-            "colors": {
-                "primary": "#007BFF",
-                "secondary": "#FFFFFF", 
-                "accent": "#FF6B35",
-                "success": "#28A745",
-                "warning": "#FFC107"
-            },
-            "fonts": ["Inter", "Arial", "Helvetica"],
-            "logo_requirements": {
-                "position": "top-right or bottom-right",
-                "size": "prominent but not overwhelming",
-                "background": "ensure good contrast"
-            },
-            "style_guidelines": {
-                "mood": "professional, motivational, aspirational",
-                "setting": "modern office, Indian professionals",
-                "quality": "high resolution, marketing ready",
-                "avoid": "cluttered, unprofessional, low quality"
-            }
-        }
-    
     async def generate_campaign_image(self, 
                                     content_context: Dict[str, Any],
                                     image_type: str = "social_media") -> Optional[str]:
@@ -75,19 +159,24 @@ class ImageGenerator:
                 image_path = await self._generate_with_stability_ai(prompt, image_type)
             else:
                 # Fallback to creating a branded template
-                image_path = self._create_branded_template(content_context, image_type)
+                image_path = await self._run_in_pool(self._create_branded_template, content_context, image_type)
             
             # Add branding overlay
             if image_path:
-                branded_path = self._add_branding_overlay(image_path, content_context)
+                branded_path = await self._run_in_pool(self._add_branding_overlay, image_path, content_context)
                 return branded_path
             
             return None
             
         except Exception as e:
-            logger.error(f"Error generating campaign image: {e}")
+            logger.error("Error generating campaign image: %s", e)
             # Return fallback template
-            return self._create_branded_template(content_context, image_type)
+            return await self._run_in_pool(self._create_branded_template, content_context, image_type)
+    
+    async def _run_in_pool(self, func, *args):
+        """Run blocking PIL work on the image thread pool, off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
     
     def _create_image_prompt(self, 
                            content_context: Dict[str, Any], 
@@ -110,7 +199,7 @@ class ImageGenerator:
         
         # Style specifications
         style_elements = [
-            f"Colors: Primary blue ({self.brand_guidelines['colors']['primary']}) and orange ({self.brand_guidelines['colors']['accent']}) accents",
+            f"Colors: Primary blue ({BRAND_GUIDELINES['colors']['primary']}) and orange ({BRAND_GUIDELINES['colors']['accent']}) accents",
             "Style: Clean, modern, high-quality, professional photography style",
             "Background: Subtle tech/data visualization elements, clean gradient",
             "Lighting: Professional, well-lit, corporate photography lighting"
@@ -174,35 +263,93 @@ class ImageGenerator:
                 "style_preset": "photographic"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/core",
-                    headers=headers,
-                    data=payload
-                ) as response:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            image_path = self.output_dir / f"campaign_{image_type}_{timestamp}.png"
+            
+            # A fixed seed makes the output deterministic, so identical requests reuse the file
+            cache_path = self._stability_cache_path(payload)
+            if self._is_fresh(cache_path):
+                _link_or_copy(cache_path, image_path)
+                logger.info("Reusing cached Stability AI image: %s", cache_path)
+                return str(image_path)
+            
+            session = self._get_session()
+            async with self._get_stability_semaphore(), session.post(
+                f"{self.base_url}/core",
+                headers=headers,
+                data=payload
+            ) as response:
+                
+                if response.status == 200:
+                    import aiofiles
                     
-                    if response.status == 200:
-                        image_data = await response.read()
-                        
-                        # Save image
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        filename = f"campaign_{image_type}_{timestamp}.png"
-                        image_path = self.output_dir / filename
-                        
-                        with open(image_path, 'wb') as f:
-                            f.write(image_data)
-                        
-                        logger.info(f"Generated image saved: {image_path}")
-                        return str(image_path)
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Stability AI API error: {response.status} - {error_text}")
-                        return None
+                    # Stream the image to disk under a name unique to this request; rename at the end so
+                    # the cache never holds partial files, even when identical requests overlap
+                    partial_path = cache_path.with_name(f"{cache_path.name}.{uuid.uuid4().hex}.part")
+                    try:
+                        async with aiofiles.open(partial_path, 'wb') as f:
+                            async for chunk in response.content.iter_chunked(STREAM_CHUNK_SIZE):
+                                await f.write(chunk)
+                        os.replace(partial_path, cache_path)
+                    finally:
+                        partial_path.unlink(missing_ok=True)
+                    _link_or_copy(cache_path, image_path)
+                    self._sweep_stability_cache()
+                    
+                    logger.info("Generated image saved: %s", image_path)
+                    return str(image_path)
+                else:
+                    error_text = await response.text()
+                    logger.error("Stability AI API error: %s - %s", response.status, error_text)
+                    return None
                         
         except Exception as e:
-            logger.error(f"Error calling Stability AI API: {e}")
+            logger.error("Error calling Stability AI API: %s", e)
             return None
     
+    def _stability_cache_path(self, payload: Dict[str, Any]) -> Path:
+        """Cache file for a Stability AI request, keyed by everything that shapes the image"""
+        key = hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+        return self.output_dir / f"cache_{key}.png"
+    
+    def _is_fresh(self, cache_path: Path) -> bool:
+        """Whether a cached image exists and is younger than the cache TTL"""
+        try:
+            return time.time() - cache_path.stat().st_mtime < STABILITY_CACHE_TTL
+        except FileNotFoundError:
+            return False
+    
+    def _sweep_stability_cache(self):
+        """Delete cached Stability AI images older than the cache TTL"""
+        for cache_path in self.output_dir.glob("cache_*.png"):
+            if not self._is_fresh(cache_path):
+                cache_path.unlink(missing_ok=True)
+    
+    def _get_session(self) -> "aiohttp.ClientSession":
+        """Shared HTTP session so Stability AI calls reuse TCP/TLS connections"""
+        
+        import aiohttp
+        
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, ttl_dns_cache=300, keepalive_timeout=60)
+            )
+        return self._session
+    
+    def _get_stability_semaphore(self) -> asyncio.Semaphore:
+        """Concurrency limit for Stability AI calls, created inside the running loop on first use"""
+        
+        # Built lazily: on Python < 3.10 a semaphore made at import binds to the wrong event loop
+        if self._stability_semaphore is None:
+            self._stability_semaphore = asyncio.Semaphore(STABILITY_MAX_CONCURRENT)
+        return self._stability_semaphore
+    
+    async def aclose(self):
+        """Close the shared HTTP session"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
     def _get_image_dimensions(self, image_type: str) -> Dict[str, Any]:
         """Get appropriate dimensions for different image types"""
         
@@ -237,29 +384,23 @@ class ImageGenerator:
         """Create a branded template when AI generation is not available"""
         
         try:
+            from PIL import Image
+            
             dimensions = self._get_image_dimensions(image_type)
             width, height = dimensions["width"], dimensions["height"]
             
-            # Create base image with gradient background
-            image = Image.new('RGB', (width, height), color='white')
-            draw = ImageDraw.Draw(image)
+            # Create vertical gradient, one colour per row, interpolated between the stops
+            ratios = np.arange(height, dtype=np.float64) / height
+            rows = np.column_stack([
+                np.interp(ratios, self._gradient_positions, self._gradient_colors[:, channel])
+                for channel in range(3)
+            ]).astype(np.uint8)
             
-            # Create gradient background
-            primary_color = self._hex_to_rgb(self.brand_guidelines['colors']['primary'])
-            accent_color = self._hex_to_rgb(self.brand_guidelines['colors']['accent'])
+            # Bake in the 50% white overlay used for text readability
+            rows = ((rows.astype(np.uint16) * 127 + 255 * 128 + 127) // 255).astype(np.uint8)
             
-            for y in range(height):
-                # Create vertical gradient
-                ratio = y / height
-                r = int(primary_color[0] * (1 - ratio) + accent_color[0] * ratio)
-                g = int(primary_color[1] * (1 - ratio) + accent_color[1] * ratio)
-                b = int(primary_color[2] * (1 - ratio) + accent_color[2] * ratio)
-                
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-            
-            # Add semi-transparent overlay for text readability
-            overlay = Image.new('RGBA', (width, height), (255, 255, 255, 128))
-            image = Image.alpha_composite(image.convert('RGBA'), overlay)
+            pixels = np.ascontiguousarray(np.broadcast_to(rows[:, None, :], (height, width, 3)))
+            image = Image.fromarray(pixels, 'RGB')
             
             # Add text content
             self._add_text_to_template(image, content_context, image_type)
@@ -269,70 +410,65 @@ class ImageGenerator:
             filename = f"template_{image_type}_{timestamp}.png"
             image_path = self.output_dir / filename
             
-            image.convert('RGB').save(image_path, 'PNG', quality=95)
+            # Intermediate artifact: the branding overlay re-encodes it right after
+            image.save(image_path, 'PNG', compress_level=INTERMEDIATE_PNG_COMPRESS_LEVEL)
             
-            logger.info(f"Created branded template: {image_path}")
+            logger.info("Created branded template: %s", image_path)
             return str(image_path)
             
         except Exception as e:
-            logger.error(f"Error creating branded template: {e}")
+            logger.error("Error creating branded template: %s", e)
             return None
     
     def _add_text_to_template(self, 
-                            image: Image.Image, 
+                            image: "Image.Image", 
                             content_context: Dict[str, Any], 
                             image_type: str):
         """Add text content to the template image"""
         
-        draw = ImageDraw.Draw(image)
+        from PIL import ImageDraw
+        
+        # Template is RGB end to end; all fills are RGB tuples
+        draw = ImageDraw.Draw(image, 'RGB')
         width, height = image.size
         
-        try:
-            # Try to load a nice font
-            title_font = ImageFont.truetype("arial.ttf", size=int(height * 0.08))
-            subtitle_font = ImageFont.truetype("arial.ttf", size=int(height * 0.05))
-            body_font = ImageFont.truetype("arial.ttf", size=int(height * 0.04))
-        except:
-            # Fallback to default font
-            title_font = ImageFont.load_default()
-            subtitle_font = ImageFont.load_default()
-            body_font = ImageFont.load_default()
+        # Try to load a nice font (cached per size, default font if missing)
+        title_size, subtitle_size, body_size = int(height * 0.08), int(height * 0.05), int(height * 0.04)
+        title_font = _get_font("arial.ttf", title_size)
+        subtitle_font = _get_font("arial.ttf", subtitle_size)
+        body_font = _get_font("arial.ttf", body_size)
         
         # Add upGrad logo text
         logo_text = "upGrad"
-        logo_bbox = draw.textbbox((0, 0), logo_text, font=title_font)
-        logo_width = logo_bbox[2] - logo_bbox[0]
+        logo_width = _text_width(logo_text, "arial.ttf", title_size)
         logo_x = width - logo_width - 50
         logo_y = 50
         
         draw.text((logo_x, logo_y), logo_text, 
-                 fill=self.brand_guidelines['colors']['primary'], font=title_font)
+                 fill=self._primary_rgb, font=title_font)
         
         # Add main content
         course = content_context.get('course', 'Professional Development')
         city = content_context.get('city', 'India')
         
         main_text = f"Transform Your Career with {course}"
-        main_bbox = draw.textbbox((0, 0), main_text, font=subtitle_font)
-        main_width = main_bbox[2] - main_bbox[0]
+        main_width = _text_width(main_text, "arial.ttf", subtitle_size)
         main_x = (width - main_width) // 2
         main_y = height // 2 - 100
         
-        draw.text((main_x, main_y), main_text, fill='white', font=subtitle_font)
+        draw.text((main_x, main_y), main_text, fill=self._white_rgb, font=subtitle_font)
         
         # Add location
         location_text = f"Opportunities in {city}"
-        location_bbox = draw.textbbox((0, 0), location_text, font=body_font)
-        location_width = location_bbox[2] - location_bbox[0]
+        location_width = _text_width(location_text, "arial.ttf", body_size)
         location_x = (width - location_width) // 2
         location_y = main_y + 80
         
-        draw.text((location_x, location_y), location_text, fill='white', font=body_font)
+        draw.text((location_x, location_y), location_text, fill=self._white_rgb, font=body_font)
         
         # Add call to action
         cta_text = "Enroll Now - Limited Seats!"
-        cta_bbox = draw.textbbox((0, 0), cta_text, font=body_font)
-        cta_width = cta_bbox[2] - cta_bbox[0]
+        cta_width = _text_width(cta_text, "arial.ttf", body_size)
         cta_x = (width - cta_width) // 2
         cta_y = height - 150
         
@@ -342,9 +478,9 @@ class ImageGenerator:
             cta_x - padding, cta_y - padding,
             cta_x + cta_width + padding, cta_y + 50
         ]
-        draw.rectangle(cta_bg_coords, fill=self.brand_guidelines['colors']['accent'])
+        draw.rectangle(cta_bg_coords, fill=self._accent_rgb)
         
-        draw.text((cta_x, cta_y), cta_text, fill='white', font=body_font)
+        draw.text((cta_x, cta_y), cta_text, fill=self._white_rgb, font=body_font)
     
     def _add_branding_overlay(self, 
                             image_path: str, 
@@ -352,23 +488,23 @@ class ImageGenerator:
         """Add branding overlay to generated image"""
         
         try:
+            from PIL import Image, ImageDraw
+            
             # Open the generated image
             with Image.open(image_path) as img:
-                # Create a copy to work with
-                branded_img = img.copy()
-                draw = ImageDraw.Draw(branded_img)
+                # Work on an RGB copy so later resizes take the fast RGB path
+                branded_img = img.convert('RGB')
+                # RGBA draw mode blends translucent fills straight onto the RGB image
+                draw = ImageDraw.Draw(branded_img, 'RGBA')
                 
                 width, height = branded_img.size
                 
                 # Add upGrad watermark
-                try:
-                    font = ImageFont.truetype("arial.ttf", size=max(24, int(height * 0.03)))
-                except:
-                    font = ImageFont.load_default()
+                font_size = max(24, int(height * 0.03))
+                font = _get_font("arial.ttf", font_size)
                 
                 watermark_text = "upGrad"
-                bbox = draw.textbbox((0, 0), watermark_text, font=font)
-                text_width = bbox[2] - bbox[0]
+                text_width = _text_width(watermark_text, "arial.ttf", font_size)
                 
                 # Position in bottom right
                 x = width - text_width - 30
@@ -380,17 +516,18 @@ class ImageGenerator:
                 
                 # Add text
                 draw.text((x, y), watermark_text, 
-                         fill=self.brand_guidelines['colors']['primary'], font=font)
+                         fill=self._primary_rgb, font=font)
                 
                 # Save branded version
-                branded_path = image_path.replace('.png', '_branded.png')
-                branded_img.save(branded_path, 'PNG', quality=95)
+                source = Path(image_path)
+                branded_path = str(source.with_name(f"{source.stem}_branded{source.suffix}"))
+                branded_img.save(branded_path, 'PNG', compress_level=FINAL_PNG_COMPRESS_LEVEL)
                 
-                logger.info(f"Added branding overlay: {branded_path}")
+                logger.info("Added branding overlay: %s", branded_path)
                 return branded_path
                 
         except Exception as e:
-            logger.error(f"Error adding branding overlay: {e}")
+            logger.error("Error adding branding overlay: %s", e)
             return image_path  # Return original if branding fails
     
     def _hex_to_rgb(self, hex_color: str) -> tuple:
@@ -404,22 +541,22 @@ class ImageGenerator:
         """Generate variations of a base image"""
         
         variation_paths = []
+        base = Path(base_image_path)
         
         for variation in variations:
             try:
                 # This would implement actual image variation logic
                 # For now, return the base image with different names
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                variation_path = base_image_path.replace('.png', f'_{variation}_{timestamp}.png')
+                variation_path = str(base.with_name(f"{base.stem}_{variation}_{timestamp}{base.suffix}"))
                 
-                # Copy the base image as variation (placeholder)
-                with Image.open(base_image_path) as img:
-                    img.save(variation_path)
+                # Link the base image as variation (placeholder), no decode/encode
+                _link_or_copy(base_image_path, variation_path)
                 
                 variation_paths.append(variation_path)
                 
             except Exception as e:
-                logger.error(f"Error creating variation {variation}: {e}")
+                logger.error("Error creating variation %s: %s", variation, e)
         
         return variation_paths
     
@@ -428,33 +565,69 @@ class ImageGenerator:
                             platform: str) -> str:
         """Optimize image for specific social media platform"""
         
-        platform_specs = {
-            "facebook": {"size": (1200, 630), "format": "JPEG"},
-            "instagram": {"size": (1080, 1080), "format": "JPEG"},
-            "linkedin": {"size": (1200, 627), "format": "PNG"},
-            "twitter": {"size": (1200, 675), "format": "JPEG"},
-            "youtube": {"size": (1280, 720), "format": "JPEG"}
-        }
-        
-        spec = platform_specs.get(platform.lower())
+        spec = PLATFORM_SPECS.get(platform.lower())
         if not spec:
             return image_path
         
         try:
+            from PIL import Image
+            
+            source = Path(image_path)
+            optimized_path = str(source.with_name(f"{source.stem}_{platform}.{spec['format'].lower()}"))
+            
+            # Header only - pixels are decoded later if a resize is really needed. This is the
+            # full-size original, so the fit check below never sees a draft-reduced decode
             with Image.open(image_path) as img:
-                # Resize for platform
-                optimized_img = img.resize(spec["size"], Image.Resampling.LANCZOS)
-                
-                # Save optimized version
-                optimized_path = image_path.replace('.png', f'_{platform}.{spec["format"].lower()}')
-                optimized_img.save(optimized_path, spec["format"], quality=90)
-                
-                logger.info(f"Optimized image for {platform}: {optimized_path}")
+                source_size = img.size
+            
+            # Already the right size and format: link the file instead of re-encoding it
+            source_format = Image.registered_extensions().get(source.suffix.lower())
+            if source_format == spec["format"] and self._fit_size(source_size, spec["size"]) == source_size:
+                _link_or_copy(image_path, optimized_path)
+                logger.info("Image already fits %s: %s", platform, optimized_path)
                 return optimized_path
-                
+            
+            image = self._load_rgb_image(image_path, spec["size"])
+            
+            target_size = self._fit_size(image.size, spec["size"])
+            if target_size == image.size:
+                optimized_img = image
+            elif max(abs(a - b) for a, b in zip(target_size, image.size)) <= 1:
+                # A one-pixel rounding difference is invisible; skip the LANCZOS kernel
+                optimized_img = image.resize(target_size, Image.Resampling.NEAREST)
+            else:
+                optimized_img = image.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+            
+            # Save optimized version
+            optimized_img.save(optimized_path, spec["format"], quality=90)
+            
+            logger.info("Optimized image for %s: %s", platform, optimized_path)
+            return optimized_path
+            
         except Exception as e:
-            logger.error(f"Error optimizing for {platform}: {e}")
+            logger.error("Error optimizing for %s: %s", platform, e)
             return image_path
+    
+    def _fit_size(self, size: tuple, bounds: tuple) -> tuple:
+        """Largest size within bounds that keeps the aspect ratio, never upscaling (as thumbnail() does)"""
+        width, height = size
+        scale = min(bounds[0] / width, bounds[1] / height, 1.0)
+        return (max(1, round(width * scale)), max(1, round(height * scale)))
+    
+    def _load_rgb_image(self, image_path: str, size: Optional[tuple] = None) -> "Image.Image":
+        """Fully decode an image into RGB, ready for repeated resizes"""
+        
+        from PIL import Image
+        
+        with Image.open(image_path) as img:
+            # Let libjpeg decode at a reduced DCT scale that still covers the target size
+            if size and img.format == 'JPEG':
+                img.draft('RGB', size)
+            
+            # SIMD resize kernels are per-mode; RGB is the fast path (and JPEG needs it)
+            if img.mode != 'RGB':
+                return img.convert('RGB')
+            return img.copy()
 
 # Global instance
 image_generator = ImageGenerator()
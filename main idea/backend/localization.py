@@ -4,210 +4,272 @@ Adapts content for Indian Tier-1 cities with cultural context
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Mapping, NamedTuple, Tuple
 from datetime import datetime
 import re
+from functools import lru_cache
+from itertools import islice
+from types import MappingProxyType
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts to read-only mappings and lists to tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+# City context data for each supported market (read-only)
+CITY_CONTEXTS = _freeze({
+    "Bangalore": {
+        "nickname": "Silicon Valley of India",
+        "key_industries": ["IT Services", "Startups", "R&D", "Biotechnology"],
+        "cultural_tone": "Tech-forward, innovation-focused, cosmopolitan",
+        "local_events": ["Bangalore Tech Summit", "Global Innovation Summit", "India Mobile Congress"],
+        "language_preference": "English with tech jargon",
+        "market_sentiment": "High competition, growth-oriented, startup culture",
+        "salary_expectations": "High (₹12-36 LPA)",
+        "work_culture": "Fast-paced, flexible, innovation-driven",
+        "key_companies": ["Infosys", "Wipro", "TCS", "Flipkart", "Ola"],
+        "hashtags": ["#BangaloreTech", "#SiliconValleyOfIndia", "#NammaOoru"],
+        "local_references": ["Namma Metro", "UB City", "Electronic City", "Whitefield"]
+    },
+    "Mumbai": {
+        "nickname": "Financial Capital of India",
+        "key_industries": ["Finance", "Media", "Entertainment", "Pharmaceuticals"],
+        "cultural_tone": "Fast-paced, opportunity-driven, commercial",
+        "local_events": ["Mumbai Fintech Festival", "Digital Marketing Summit", "Bombay Stock Exchange Events"],
+        "language_preference": "English/Hindi mix, business-focused",
+        "market_sentiment": "Networking-focused, premium positioning, ambitious",
+        "salary_expectations": "Premium (₹10-22 LPA)",
+        "work_culture": "Hustle mentality, networking-heavy, results-oriented",
+        "key_companies": ["Reliance", "Tata Group", "HDFC", "Kotak Mahindra"],
+        "hashtags": ["#MumbaiFinance", "#MaxCity", "#BombayDreams"],
+        "local_references": ["Nariman Point", "BKC", "Marine Drive", "Local trains"]
+    },
+    "Delhi NCR": {
+        "nickname": "Corporate Hub of India",
+        "key_industries": ["Government", "Consulting", "MNCs", "Manufacturing"],
+        "cultural_tone": "Professional, hierarchical, power-conscious",
+        "local_events": ["Delhi Business Summit", "India Leadership Conclave", "CII Events"],
+        "language_preference": "Hindi/English mix, formal tone",
+        "market_sentiment": "Authority-respecting, status-conscious, traditional",
+        "salary_expectations": "Competitive (₹11-24 LPA)",
+        "work_culture": "Formal, hierarchy-aware, relationship-based",
+        "key_companies": ["HCL", "Tech Mahindra", "Maruti Suzuki", "Hero MotoCorp"],
+        "hashtags": ["#DelhiNCR", "#CapitalCareers", "#DilliKiDhadak"],
+        "local_references": ["Connaught Place", "Gurgaon", "Noida", "Metro"]
+    },
+    "Hyderabad": {
+        "nickname": "Cyberabad",
+        "key_industries": ["IT Services", "Biotech", "Aerospace", "Pharmaceuticals"],
+        "cultural_tone": "Tech-savvy, cost-conscious, traditional yet modern",
+        "local_events": ["Hyderabad Tech Conference", "BioTech Summit", "HITEC City Events"],
+        "language_preference": "Telugu/English mix, respectful tone",
+        "market_sentiment": "Value-focused, pragmatic, family-oriented",
+        "salary_expectations": "Value-driven (₹9-20 LPA)",
+        "work_culture": "Balanced, family-friendly, cost-effective",
+        "key_companies": ["Microsoft", "Google", "Amazon", "Facebook"],
+        "hashtags": ["#Cyberabad", "#HyderabadTech", "#CityOfPearls"],
+        "local_references": ["HITEC City", "Gachibowli", "Jubilee Hills", "Charminar"]
+    },
+    "Chennai": {
+        "nickname": "Detroit of India",
+        "key_industries": ["Automotive", "Manufacturing", "IT", "Healthcare"],
+        "cultural_tone": "Traditional yet progressive, quality-focused",
+        "local_events": ["Chennai Auto Expo", "South India Tech Meet", "Manufacturing Summit"],
+        "language_preference": "Tamil/English mix, respectful approach",
+        "market_sentiment": "Quality-focused, relationship-driven, conservative",
+        "salary_expectations": "Steady (₹8-18 LPA)",
+        "work_culture": "Methodical, quality-oriented, relationship-based",
+        "key_companies": ["TCS", "Cognizant", "Ford", "Hyundai"],
+        "hashtags": ["#ChennaiTech", "#DetroitOfIndia", "#TamilNaduTech"],
+        "local_references": ["OMR", "Velachery", "T.Nagar", "Marina Beach"]
+    },
+    "Pune": {
+        "nickname": "Oxford of the East",
+        "key_industries": ["Education", "IT", "Automotive", "Manufacturing"],
+        "cultural_tone": "Academic, youthful, collaborative",
+        "local_events": ["Pune Tech Festival", "Education Innovation Summit", "Auto Expo"],
+        "language_preference": "Marathi/English mix, academic tone",
+        "market_sentiment": "Learning-oriented, collaborative, student-friendly",
+        "salary_expectations": "Moderate (₹9-19 LPA)",
+        "work_culture": "Academic, collaborative, innovation-friendly",
+        "key_companies": ["Infosys", "TCS", "Bajaj", "Mahindra"],
+        "hashtags": ["#PuneTech", "#OxfordOfTheEast", "#PuneIT"],
+        "local_references": ["Hinjewadi", "Magarpatta", "Koregaon Park", "Deccan"]
+    },
+    "Ahmedabad": {
+        "nickname": "Manchester of India",
+        "key_industries": ["Textiles", "Chemicals", "Pharmaceuticals", "IT"],
+        "cultural_tone": "Business-minded, entrepreneurial, traditional",
+        "local_events": ["Gujarat Business Summit", "Textile Expo", "Pharma Conference"],
+        "language_preference": "Gujarati/English mix, business-focused",
+        "market_sentiment": "Entrepreneurial, cost-effective, business-oriented",
+        "salary_expectations": "Cost-effective (₹7-16 LPA)",
+        "work_culture": "Entrepreneurial, family-business oriented, frugal",
+        "key_companies": ["Adani Group", "Torrent", "Zydus", "Infibeam"],
+        "hashtags": ["#AhmedabadBusiness", "#GujaratTech", "#ManchesterOfIndia"],
+        "local_references": ["SG Highway", "Satellite", "Vastrapur", "Sabarmati"]
+    },
+    "Kolkata": {
+        "nickname": "Cultural Capital of India",
+        "key_industries": ["IT", "Finance", "Jute", "Steel"],
+        "cultural_tone": "Intellectual, cultural, traditional",
+        "local_events": ["Kolkata Book Fair", "Bengal IT Summit", "Cultural Festivals"],
+        "language_preference": "Bengali/English mix, intellectual tone",
+        "market_sentiment": "Intellectual, culture-appreciating, traditional",
+        "salary_expectations": "Modest (₹6-15 LPA)",
+        "work_culture": "Intellectual, discussion-oriented, culture-rich",
+        "key_companies": ["TCS", "Wipro", "ITC", "Coal India"],
+        "hashtags": ["#KolkataTech", "#CulturalCapital", "#CityOfJoy"],
+        "local_references": ["Salt Lake", "New Town", "Park Street", "Howrah Bridge"]
+    }
+})
+
+# Regional language translations for key phrases (read-only)
+REGIONAL_LANGUAGES = _freeze({
+    "Bangalore": {
+        "hello": "Namaskara",
+        "opportunity": "Avakasha",
+        "career": "Vyavasaya",
+        "success": "Safalate"
+    },
+    "Mumbai": {
+        "hello": "Namaskar",
+        "opportunity": "Mauka",
+        "career": "Career",
+        "success": "Safalta"
+    },
+    "Delhi NCR": {
+        "hello": "Namaste",
+        "opportunity": "Mauka",
+        "career": "Career",
+        "success": "Safalta"
+    },
+    "Hyderabad": {
+        "hello": "Namaste",
+        "opportunity": "Avakasam",
+        "career": "Udyogam",
+        "success": "Vijayam"
+    },
+    "Chennai": {
+        "hello": "Vanakkam",
+        "opportunity": "Vaaipu",
+        "career": "Thozhil",
+        "success": "Vetri"
+    },
+    "Pune": {
+        "hello": "Namaskar",
+        "opportunity": "Sandhi",
+        "career": "Vyavasaya",
+        "success": "Yash"
+    }
+})
+
+# Upcoming local events for each city (read-only)
+LOCAL_EVENTS = _freeze({
+    "Bangalore": [
+        {"name": "Bangalore Tech Summit", "date": "November 2025", "relevance": "High"},
+        {"name": "Global Innovation Summit", "date": "December 2025", "relevance": "Medium"},
+        {"name": "India Mobile Congress", "date": "October 2025", "relevance": "High"}
+    ],
+    "Mumbai": [
+        {"name": "Mumbai Fintech Festival", "date": "October 2025", "relevance": "High"},
+        {"name": "Digital Marketing Summit", "date": "November 2025", "relevance": "Medium"}
+    ],
+    "Delhi NCR": [
+        {"name": "Delhi Business Summit", "date": "December 2025", "relevance": "High"},
+        {"name": "India Leadership Conclave", "date": "January 2026", "relevance": "Medium"}
+    ]
+})
+
+# Cultural adaptation rules (read-only)
+CULTURAL_ADAPTATIONS = _freeze({
+    "formal_cities": ["Delhi NCR", "Mumbai", "Chennai"],
+    "tech_cities": ["Bangalore", "Hyderabad", "Pune"],
+    "business_cities": ["Mumbai", "Ahmedabad", "Delhi NCR"],
+    "youth_cities": ["Pune", "Bangalore", "Hyderabad"],
+    "traditional_cities": ["Chennai", "Kolkata", "Ahmedabad"]
+})
+
+# Keywords the tone, culture and platform rules look for in city descriptions
+CULTURE_KEYWORDS = (
+    'formal', 'hierarchical', 'tech-forward', 'innovation', 'traditional', 'business',
+    'family-friendly', 'fast-paced', 'networking', 'entrepreneurial'
+)
+
+@lru_cache(maxsize=128)
+def _culture_keywords(description: str) -> frozenset:
+    """Keywords contained in a tone/culture description, scanned once per distinct string"""
+    return frozenset(keyword for keyword in CULTURE_KEYWORDS if keyword in description)
+
+# Patterns used on every localized campaign, compiled once
+HASHTAG_RE = re.compile(r'#\w+')
+URGENT_SENTIMENT_RE = re.compile(r'high competition', re.IGNORECASE)
+
+# Closing line appended to email bodies, by work culture keyword
+BODY_CLOSINGS = (
+    ('family-friendly', "\n\nJoin thousands of professionals who've transformed their careers while maintaining work-life balance."),
+    ('fast-paced', "\n\nJoin the fast-track to success with industry-leading curriculum and expert mentorship.")
+)
+
+class CityContext(NamedTuple):
+    """Pre-normalized city context read on every localization call"""
+    
+    city: str = ''
+    nickname: str = ''
+    key_industries: Tuple[str, ...] = ()
+    hashtags: Tuple[str, ...] = ()
+    local_references: Tuple[str, ...] = ()
+    language_preference: str = 'English'
+    urgent: bool = False
+    tone_tokens: frozenset = frozenset()
+    work_tokens: frozenset = frozenset()
+    
+    @classmethod
+    def from_mapping(cls, context: Mapping[str, Any]) -> 'CityContext':
+        """Build the normalized view from a raw city context mapping"""
+        return cls(
+            city=context.get('city', ''),
+            nickname=context.get('nickname', ''),
+            key_industries=tuple(context.get('key_industries', ())),
+            hashtags=tuple(context.get('hashtags', ())),
+            local_references=tuple(context.get('local_references', ())),
+            language_preference=context.get('language_preference', 'English'),
+            urgent=bool(URGENT_SENTIMENT_RE.search(context.get('market_sentiment', ''))),
+            tone_tokens=_culture_keywords(context.get('cultural_tone', '')),
+            work_tokens=_culture_keywords(context.get('work_culture', ''))
+        )
+
+# Normalized contexts for each supported market, built once at import
+CITY_PROFILES = MappingProxyType({
+    city: CityContext.from_mapping(context) for city, context in CITY_CONTEXTS.items()
+})
+
 class LocalizationEngine:
     """
     Provides city-specific content localization for Indian markets
     Incorporates cultural context, local events, and regional preferences
     """
     
-    def __init__(self):
-        self.city_contexts = self._load_city_contexts()
-        self.regional_languages = self._load_regional_languages()
-        self.local_events = self._load_local_events()
-        self.cultural_adaptations = self._load_cultural_adaptations()
+    __slots__ = ('city_contexts', 'regional_languages', 'local_events', 'cultural_adaptations')
     
-    def _load_city_contexts(self) -> Dict[str, Dict[str, Any]]:
-        """Load comprehensive city context data"""
-        return {
-            "Bangalore": {
-                "nickname": "Silicon Valley of India",
-                "key_industries": ["IT Services", "Startups", "R&D", "Biotechnology"],
-                "cultural_tone": "Tech-forward, innovation-focused, cosmopolitan",
-                "local_events": ["Bangalore Tech Summit", "Global Innovation Summit", "India Mobile Congress"],
-                "language_preference": "English with tech jargon",
-                "market_sentiment": "High competition, growth-oriented, startup culture",
-                "salary_expectations": "High (₹12-36 LPA)",
-                "work_culture": "Fast-paced, flexible, innovation-driven",
-                "key_companies": ["Infosys", "Wipro", "TCS", "Flipkart", "Ola"],
-                "hashtags": ["#BangaloreTech", "#SiliconValleyOfIndia", "#NammaOoru"],
-                "local_references": ["Namma Metro", "UB City", "Electronic City", "Whitefield"]
-            },
-            "Mumbai": {
-                "nickname": "Financial Capital of India",
-                "key_industries": ["Finance", "Media", "Entertainment", "Pharmaceuticals"],
-                "cultural_tone": "Fast-paced, opportunity-driven, commercial",
-                "local_events": ["Mumbai Fintech Festival", "Digital Marketing Summit", "Bombay Stock Exchange Events"],
-                "language_preference": "English/Hindi mix, business-focused",
-                "market_sentiment": "Networking-focused, premium positioning, ambitious",
-                "salary_expectations": "Premium (₹10-22 LPA)",
-                "work_culture": "Hustle mentality, networking-heavy, results-oriented",
-                "key_companies": ["Reliance", "Tata Group", "HDFC", "Kotak Mahindra"],
-                "hashtags": ["#MumbaiFinance", "#MaxCity", "#BombayDreams"],
-                "local_references": ["Nariman Point", "BKC", "Marine Drive", "Local trains"]
-            },
-            "Delhi NCR": {
-                "nickname": "Corporate Hub of India",
-                "key_industries": ["Government", "Consulting", "MNCs", "Manufacturing"],
-                "cultural_tone": "Professional, hierarchical, power-conscious",
-                "local_events": ["Delhi Business Summit", "India Leadership Conclave", "CII Events"],
-                "language_preference": "Hindi/English mix, formal tone",
-                "market_sentiment": "Authority-respecting, status-conscious, traditional",
-                "salary_expectations": "Competitive (₹11-24 LPA)",
-                "work_culture": "Formal, hierarchy-aware, relationship-based",
-                "key_companies": ["HCL", "Tech Mahindra", "Maruti Suzuki", "Hero MotoCorp"],
-                "hashtags": ["#DelhiNCR", "#CapitalCareers", "#DilliKiDhadak"],
-                "local_references": ["Connaught Place", "Gurgaon", "Noida", "Metro"]
-            },
-            "Hyderabad": {
-                "nickname": "Cyberabad",
-                "key_industries": ["IT Services", "Biotech", "Aerospace", "Pharmaceuticals"],
-                "cultural_tone": "Tech-savvy, cost-conscious, traditional yet modern",
-                "local_events": ["Hyderabad Tech Conference", "BioTech Summit", "HITEC City Events"],
-                "language_preference": "Telugu/English mix, respectful tone",
-                "market_sentiment": "Value-focused, pragmatic, family-oriented",
-                "salary_expectations": "Value-driven (₹9-20 LPA)",
-                "work_culture": "Balanced, family-friendly, cost-effective",
-                "key_companies": ["Microsoft", "Google", "Amazon", "Facebook"],
-                "hashtags": ["#Cyberabad", "#HyderabadTech", "#CityOfPearls"],
-                "local_references": ["HITEC City", "Gachibowli", "Jubilee Hills", "Charminar"]
-            },
-            "Chennai": {
-                "nickname": "Detroit of India",
-                "key_industries": ["Automotive", "Manufacturing", "IT", "Healthcare"],
-                "cultural_tone": "Traditional yet progressive, quality-focused",
-                "local_events": ["Chennai Auto Expo", "South India Tech Meet", "Manufacturing Summit"],
-                "language_preference": "Tamil/English mix, respectful approach",
-                "market_sentiment": "Quality-focused, relationship-driven, conservative",
-                "salary_expectations": "Steady (₹8-18 LPA)",
-                "work_culture": "Methodical, quality-oriented, relationship-based",
-                "key_companies": ["TCS", "Cognizant", "Ford", "Hyundai"],
-                "hashtags": ["#ChennaiTech", "#DetroitOfIndia", "#TamilNaduTech"],
-                "local_references": ["OMR", "Velachery", "T.Nagar", "Marina Beach"]
-            },
-            "Pune": {
-                "nickname": "Oxford of the East",
-                "key_industries": ["Education", "IT", "Automotive", "Manufacturing"],
-                "cultural_tone": "Academic, youthful, collaborative",
-                "local_events": ["Pune Tech Festival", "Education Innovation Summit", "Auto Expo"],
-                "language_preference": "Marathi/English mix, academic tone",
-                "market_sentiment": "Learning-oriented, collaborative, student-friendly",
-                "salary_expectations": "Moderate (₹9-19 LPA)",
-                "work_culture": "Academic, collaborative, innovation-friendly",
-                "key_companies": ["Infosys", "TCS", "Bajaj", "Mahindra"],
-                "hashtags": ["#PuneTech", "#OxfordOfTheEast", "#PuneIT"],
-                "local_references": ["Hinjewadi", "Magarpatta", "Koregaon Park", "Deccan"]
-            },
-            "Ahmedabad": {
-                "nickname": "Manchester of India",
-                "key_industries": ["Textiles", "Chemicals", "Pharmaceuticals", "IT"],
-                "cultural_tone": "Business-minded, entrepreneurial, traditional",
-                "local_events": ["Gujarat Business Summit", "Textile Expo", "Pharma Conference"],
-                "language_preference": "Gujarati/English mix, business-focused",
-                "market_sentiment": "Entrepreneurial, cost-effective, business-oriented",
-                "salary_expectations": "Cost-effective (₹7-16 LPA)",
-                "work_culture": "Entrepreneurial, family-business oriented, frugal",
-                "key_companies": ["Adani Group", "Torrent", "Zydus", "Infibeam"],
-                "hashtags": ["#AhmedabadBusiness", "#GujaratTech", "#ManchesterOfIndia"],
-                "local_references": ["SG Highway", "Satellite", "Vastrapur", "Sabarmati"]
-            },
-            "Kolkata": {
-                "nickname": "Cultural Capital of India",
-                "key_industries": ["IT", "Finance", "Jute", "Steel"],
-                "cultural_tone": "Intellectual, cultural, traditional",
-                "local_events": ["Kolkata Book Fair", "Bengal IT Summit", "Cultural Festivals"],
-                "language_preference": "Bengali/English mix, intellectual tone",
-                "market_sentiment": "Intellectual, culture-appreciating, traditional",
-                "salary_expectations": "Modest (₹6-15 LPA)",
-                "work_culture": "Intellectual, discussion-oriented, culture-rich",
-                "key_companies": ["TCS", "Wipro", "ITC", "Coal India"],
-                "hashtags": ["#KolkataTech", "#CulturalCapital", "#CityOfJoy"],
-                "local_references": ["Salt Lake", "New Town", "Park Street", "Howrah Bridge"]
-            }
-        }
-    
-    def _load_regional_languages(self) -> Dict[str, Dict[str, str]]:
-        """Load regional language translations for key phrases"""
-        return {
-            "Bangalore": {
-                "hello": "Namaskara",
-                "opportunity": "Avakasha",
-                "career": "Vyavasaya",
-                "success": "Safalate"
-            },
-            "Mumbai": {
-                "hello": "Namaskar",
-                "opportunity": "Mauka",
-                "career": "Career",
-                "success": "Safalta"
-            },
-            "Delhi NCR": {
-                "hello": "Namaste",
-                "opportunity": "Mauka",
-                "career": "Career",
-                "success": "Safalta"
-            },
-            "Hyderabad": {
-                "hello": "Namaste",
-                "opportunity": "Avakasam",
-                "career": "Udyogam",
-                "success": "Vijayam"
-            },
-            "Chennai": {
-                "hello": "Vanakkam",
-                "opportunity": "Vaaipu",
-                "career": "Thozhil",
-                "success": "Vetri"
-            },
-            "Pune": {
-                "hello": "Namaskar",
-                "opportunity": "Sandhi",
-                "career": "Vyavasaya",
-                "success": "Yash"
-            }
-        }
-    
-    def _load_local_events(self) -> Dict[str, List[Dict[str, str]]]:
-        """Load upcoming local events for each city"""
-        return {
-            "Bangalore": [
-                {"name": "Bangalore Tech Summit", "date": "November 2025", "relevance": "High"},
-                {"name": "Global Innovation Summit", "date": "December 2025", "relevance": "Medium"},
-                {"name": "India Mobile Congress", "date": "October 2025", "relevance": "High"}
-            ],
-            "Mumbai": [
-                {"name": "Mumbai Fintech Festival", "date": "October 2025", "relevance": "High"},
-                {"name": "Digital Marketing Summit", "date": "November 2025", "relevance": "Medium"}
-            ],
-            "Delhi NCR": [
-                {"name": "Delhi Business Summit", "date": "December 2025", "relevance": "High"},
-                {"name": "India Leadership Conclave", "date": "January 2026", "relevance": "Medium"}
-            ]
-        }
-    
-    def _load_cultural_adaptations(self) -> Dict[str, Dict[str, Any]]:
-        """Load cultural adaptation rules"""
-        return {
-            "formal_cities": ["Delhi NCR", "Mumbai", "Chennai"],
-            "tech_cities": ["Bangalore", "Hyderabad", "Pune"],
-            "business_cities": ["Mumbai", "Ahmedabad", "Delhi NCR"],
-            "youth_cities": ["Pune", "Bangalore", "Hyderabad"],
-            "traditional_cities": ["Chennai", "Kolkata", "Ahmedabad"]
-        }
+    def __init__(self):
+        # Shared read-only tables; instances only hold references
+        self.city_contexts = CITY_PROFILES
+        self.regional_languages = REGIONAL_LANGUAGES
+        self.local_events = LOCAL_EVENTS
+        self.cultural_adaptations = CULTURAL_ADAPTATIONS
     
     def localize_content(self, content: Dict[str, Any], city: str) -> Dict[str, Any]:
         """Apply comprehensive localization to campaign content"""
         
-        city_context = self.city_contexts.get(city, {})
-        if not city_context:
-            logger.warning(f"No localization data for city: {city}")
+        city_context = self.city_contexts.get(city)
+        if city_context is None:
+            logger.warning("No localization data for city: %s", city)
             return content
         
         localized_content = content.copy()
@@ -232,80 +294,73 @@ class LocalizationEngine:
             content, city_context
         )
         
-        # Add local context
-        localized_content['local_context'] = city_context
+        # Add local context (a plain dict copy so it can be serialized)
+        localized_content['local_context'] = dict(CITY_CONTEXTS[city])
         
         return localized_content
     
-    def _localize_subject(self, subject: str, context: Dict[str, Any]) -> str:
+    def _localize_subject(self, subject: str, context: CityContext) -> str:
         """Localize email subject line with city context"""
         
-        nickname = context.get('nickname', '')
-        city_name = context.get('city', '')
+        nickname = context.nickname
         
         # Add city nickname if not already present
         if nickname and nickname not in subject:
             subject = f"{subject} | {nickname}"
         
         # Add urgency based on market sentiment
-        sentiment = context.get('market_sentiment', '')
-        if 'high competition' in sentiment.lower():
+        if context.urgent:
             subject = subject.replace('!', ' - Act Fast!')
         
         return subject[:60]  # Keep within email subject limits
     
-    def _localize_body(self, body: str, context: Dict[str, Any]) -> str:
+    def _localize_body(self, body: str, context: CityContext) -> str:
         """Localize email body with comprehensive city context"""
         
-        # Add local industry context
-        industries = context.get('key_industries', [])
-        if industries:
-            industry_text = f"\n\nWith {', '.join(industries[:2])} leading {context.get('nickname', 'the city')}'s growth"
-            body += industry_text
-        
-        # Add local events
-        events = self._get_relevant_events(context.get('city', ''))
-        if events:
-            event_text = f", and upcoming events like {events[0]['name']}"
-            body += event_text
-        
-        # Add local references
-        references = context.get('local_references', [])
-        if references:
-            ref_text = f" in areas like {references[0]}"
-            body += ref_text
-        
-        # Add cultural closing
-        work_culture = context.get('work_culture', '')
-        if 'family-friendly' in work_culture:
-            body += "\n\nJoin thousands of professionals who've transformed their careers while maintaining work-life balance."
-        elif 'fast-paced' in work_culture:
-            body += "\n\nJoin the fast-track to success with industry-leading curriculum and expert mentorship."
+        industries = context.key_industries
+        nickname = context.nickname or 'the city'
+        events = self._get_relevant_events(context.city)
+        event = events[0]['name'] if events else ''
+        references = context.local_references
+        reference = references[0] if references else ''
+        
+        # Cultural closing
+        closing = next((text for keyword, text in BODY_CLOSINGS if keyword in context.work_tokens), '')
         
-        return body
+        # Collect the fragments and join them once
+        parts = [body]
+        if industries:
+            parts.append(f"\n\nWith {', '.join(industries[:2])} leading {nickname}'s growth")
+        if event:
+            parts.append(f", and upcoming events like {event}")
+        if reference:
+            parts.append(f" in areas like {reference}")
+        parts.append(closing)
+        return ''.join(parts)
     
-    def _localize_social(self, social_post: str, context: Dict[str, Any]) -> str:
+    def _localize_social(self, social_post: str, context: CityContext) -> str:
         """Localize social media post with city-specific hashtags"""
         
         # Add city-specific hashtags
-        hashtags = context.get('hashtags', [])
+        hashtags = context.hashtags
         if hashtags:
             # Remove existing generic hashtags and add city-specific ones
-            social_post = re.sub(r'#\w+', '', social_post).strip()
-            social_post += f" {' '.join(hashtags[:3])}"
+            if '#' in social_post:
+                social_post = HASHTAG_RE.sub('', social_post)
+            social_post = f"{social_post.strip()} {' '.join(islice(hashtags, 3))}"
         
         # Add local references if space allows
         if len(social_post) < 200:  # Leave room for additions
-            references = context.get('local_references', [])
+            references = context.local_references
             if references:
                 social_post += f" #{references[0].replace(' ', '')}"
         
         return social_post[:280]  # Twitter limit
     
-    def _create_regional_version(self, content: Dict[str, Any], context: Dict[str, Any]) -> str:
+    def _create_regional_version(self, content: Dict[str, Any], context: CityContext) -> str:
         """Create a regional language version of the campaign"""
         
-        city = context.get('city', '')
+        city = context.city
         regional_lang = self.regional_languages.get(city, {})
         
         if not regional_lang:
@@ -317,7 +372,7 @@ class LocalizationEngine:
         career = regional_lang.get('career', 'career')
         success = regional_lang.get('success', 'success')
         
-        regional_text = f"{hello}! {context.get('nickname', city)} mein {opportunity} hai! "
+        regional_text = f"{hello}! {context.nickname or city} mein {opportunity} hai! "
         regional_text += f"Apna {career} transform karo aur {success} pao upGrad ke saath!"
         
         return regional_text
@@ -331,25 +386,36 @@ class LocalizationEngine:
     def get_localization_recommendations(self, city: str, course: str) -> Dict[str, Any]:
         """Get localization recommendations for a specific city and course"""
         
-        context = self.city_contexts.get(city, {})
-        if not context:
-            return {"error": f"No localization data available for {city}"}
+        # Recommendations only depend on the static city tables, so they are built once
+        # per (city, course); callers get a fresh top-level dict over immutable values
+        recommendations = dict(self._build_recommendations(city, course))
+        if 'optimal_timing' in recommendations:
+            recommendations['optimal_timing'] = dict(recommendations['optimal_timing'])
+        return recommendations
+    
+    @lru_cache(maxsize=512)
+    def _build_recommendations(self, city: str, course: str) -> MappingProxyType:
+        """Build the recommendations for a city and course once"""
+        
+        context = self.city_contexts.get(city)
+        if context is None:
+            return MappingProxyType({"error": f"No localization data available for {city}"})
         
         recommendations = {
-            "tone_adjustments": self._get_tone_recommendations(context, course),
-            "cultural_considerations": self._get_cultural_considerations(context),
-            "local_hooks": self._get_local_hooks(context, course),
-            "language_preferences": context.get('language_preference', 'English'),
-            "optimal_timing": self._get_optimal_timing(context),
-            "platform_preferences": self._get_platform_preferences(context)
+            "tone_adjustments": tuple(self._get_tone_recommendations(context, course)),
+            "cultural_considerations": tuple(self._get_cultural_considerations(context)),
+            "local_hooks": tuple(self._get_local_hooks(context, course)),
+            "language_preferences": context.language_preference,
+            "optimal_timing": MappingProxyType(self._get_optimal_timing(context)),
+            "platform_preferences": tuple(self._get_platform_preferences(context))
         }
         
-        return recommendations
+        return MappingProxyType(recommendations)
     
-    def _get_tone_recommendations(self, context: Dict[str, Any], course: str) -> List[str]:
+    def _get_tone_recommendations(self, context: CityContext, course: str) -> List[str]:
         """Get tone recommendations based on city culture"""
         
-        cultural_tone = context.get('cultural_tone', '')
+        cultural_tone = context.tone_tokens
         recommendations = []
         
         if 'formal' in cultural_tone or 'hierarchical' in cultural_tone:
@@ -366,11 +432,11 @@ class LocalizationEngine:
         
         return recommendations
     
-    def _get_cultural_considerations(self, context: Dict[str, Any]) -> List[str]:
+    def _get_cultural_considerations(self, context: CityContext) -> List[str]:
         """Get cultural considerations for the city"""
         
         considerations = []
-        work_culture = context.get('work_culture', '')
+        work_culture = context.work_tokens
         
         if 'family-friendly' in work_culture:
             considerations.append("Emphasize work-life balance")
@@ -386,12 +452,12 @@ class LocalizationEngine:
         
         return considerations
     
-    def _get_local_hooks(self, context: Dict[str, Any], course: str) -> List[str]:
+    def _get_local_hooks(self, context: CityContext, course: str) -> List[str]:
         """Generate local hooks for campaigns"""
         
         hooks = []
-        nickname = context.get('nickname', '')
-        industries = context.get('key_industries', [])
+        nickname = context.nickname
+        industries = context.key_industries
         
         if nickname:
             hooks.append(f"Join {nickname}'s tech revolution")
@@ -421,10 +487,10 @@ class LocalizationEngine:
         
         return industries[0] if industries else None
     
-    def _get_optimal_timing(self, context: Dict[str, Any]) -> Dict[str, str]:
+    def _get_optimal_timing(self, context: CityContext) -> Dict[str, str]:
         """Get optimal timing recommendations"""
         
-        work_culture = context.get('work_culture', '')
+        work_culture = context.work_tokens
         
         if 'fast-paced' in work_culture:
             return {"best_time": "Early morning or late evening", "avoid": "Lunch hours"}
@@ -433,10 +499,10 @@ class LocalizationEngine:
         else:
             return {"best_time": "Business hours", "avoid": "Weekends"}
     
-    def _get_platform_preferences(self, context: Dict[str, Any]) -> List[str]:
+    def _get_platform_preferences(self, context: CityContext) -> List[str]:
         """Get platform preferences based on city culture"""
         
-        cultural_tone = context.get('cultural_tone', '')
+        cultural_tone = context.tone_tokens
         
         if 'tech-forward' in cultural_tone:
             return ["LinkedIn", "Twitter", "Instagram"]
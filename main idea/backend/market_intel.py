@@ -12,8 +12,6 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 import logging
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class MarketIntelligenceEngine:
@@ -35,18 +33,18 @@ class MarketIntelligenceEngine:
             # Load hiring data
             hiring_file = self.data_path / "comprehensive_company_hiring_data (2).xlsx"
             self.hiring_df = pd.read_excel(hiring_file)
-            logger.info(f"Loaded hiring data: {self.hiring_df.shape[0]} companies")
+            logger.info("Loaded hiring data: %s companies", self.hiring_df.shape[0])
             
             # Load marketing automation data
             marketing_file = self.data_path / "intelligent_marketing_automation_data.xlsx"
             self.campaign_df = pd.read_excel(marketing_file, sheet_name="Campaign_Performance")
-            logger.info(f"Loaded campaign data: {self.campaign_df.shape[0]} campaigns")
+            logger.info("Loaded campaign data: %s campaigns", self.campaign_df.shape[0])
             
             # Preprocess data
             self._preprocess_data()
             
         except Exception as e:
-            logger.error(f"Error loading data: {e}")
+            logger.error("Error loading data: %s", e)
             # Create dummy data for development
             self._create_dummy_data()
     
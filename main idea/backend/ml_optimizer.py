@@ -6,26 +6,185 @@ ML-based campaign optimization and performance prediction
 import numpy as np
 import pandas as pd
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from pathlib import Path
+import hashlib
 import json
 import joblib
+import atexit
+import gzip
+import os
+import queue
+import shutil
+import tempfile
+import threading
+import time
+from functools import cached_property, lru_cache
 
 try:
-    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+    from sklearn.ensemble import HistGradientBoostingRegressor, GradientBoostingRegressor
+    from sklearn.inspection import permutation_importance
     from sklearn.model_selection import train_test_split, cross_val_score
-    from sklearn.preprocessing import LabelEncoder, StandardScaler
+    from sklearn.preprocessing import OrdinalEncoder, StandardScaler
     from sklearn.metrics import mean_squared_error, r2_score
     SKLEARN_AVAILABLE = True
 except ImportError:
     SKLEARN_AVAILABLE = False
     logging.warning("Scikit-learn not available. Install with: pip install scikit-learn")
 
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+try:
+    import orjson
+    
+    def _feedback_line(entry: Dict[str, Any]) -> bytes:
+        return orjson.dumps(
+            entry, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    _json_loads = orjson.loads
+except ImportError:
+    def _feedback_line(entry: Dict[str, Any]) -> bytes:
+        return (json.dumps(entry, separators=(',', ':')) + '\n').encode('utf-8')
+    _json_loads = json.loads
+
+try:
+    import onnxruntime as ort
+    from skl2onnx import convert_sklearn
+    from skl2onnx.common.data_types import FloatTensorType
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Model input columns, in training order (categorical features are ordinal-encoded)
+CATEGORICAL_FEATURES = [
+    'brand_id', 'content_theme', 'visual_style', 'target_emotion',
+    'campaign_type', 'platform', 'target_city', 'target_age_group'
+]
+NUMERICAL_FEATURES = ['character_count', 'readability_score', 'brand_consistency_score', 'accessibility_score']
+
+# Possible values for each categorical feature in synthetic training data
+SYNTHETIC_CATEGORIES = {
+    'brand_id': ['upgrad', 'byju', 'unacademy', 'vedantu'],
+    'content_theme': ['AI/ML Skills', 'Career Growth', 'Job Security', 'Salary Boost', 'Skill Development'],
+    'visual_style': ['Modern', 'Professional', 'Creative', 'Minimalist'],
+    'target_emotion': ['Motivation', 'Urgency', 'Confidence', 'Aspiration'],
+    'campaign_type': ['Email', 'Social Media', 'Display Ads'],
+    'platform': ['Facebook', 'Instagram', 'LinkedIn', 'Twitter', 'YouTube', 'Google Ads'],
+    'target_city': ['Bangalore', 'Mumbai', 'Delhi NCR', 'Hyderabad', 'Chennai', 'Pune'],
+    'target_age_group': ['22-28', '28-35', '35-42', '42-50']
+}
+
+# Training data workbook and the fingerprint of the data the saved model was fitted on
+TRAINING_DATA_FILE = "intelligent_marketing_automation_data.xlsx"
+TRAINING_HASH_FILE = "campaign_training_data.sha256"
+
+# Bump when the synthetic data generator changes so saved models are retrained
+SYNTHETIC_DATA_VERSION = "synthetic-v3"
+
+# Hyperparameters shared by the point model and its quantile bounds
+MODEL_PARAMS = {
+    'max_iter': 100,
+    'max_depth': 8,
+    'learning_rate': 0.05,
+    'random_state': 42
+}
+
+# Quantiles bracketing each prediction; the band width drives the confidence level
+CONFIDENCE_QUANTILES = (0.1, 0.9)
+
+# Append-only log of actual campaign performance, one JSON object per line
+FEEDBACK_FILE = "performance_feedback.jsonl"
+
+# JSON array of feedback written by earlier versions, migrated into the log once
+LEGACY_FEEDBACK_FILE = "performance_feedback.json"
+
+# Feedback writes are batched by a background thread: flushed after this long or once this many bytes queue up
+FEEDBACK_FLUSH_INTERVAL = 0.1
+FEEDBACK_FLUSH_BYTES = 64 * 1024
+
+# The active feedback log is rotated past this size and the old segment gzipped
+FEEDBACK_ROTATE_BYTES = 8 * 1024 * 1024
+FEEDBACK_GZIP_LEVEL = 3
+
+# Compiled copy of the model served through ONNX Runtime when available
+ONNX_MODEL_FILE = "campaign_optimizer_model.onnx"
+
+# Default campaign parameters used when a prediction request leaves one out
+FEATURE_DEFAULTS = {
+    'brand_id': 'upgrad',
+    'content_theme': 'Career Growth',
+    'visual_style': 'Professional',
+    'target_emotion': 'Motivation',
+    'campaign_type': 'Email',
+    'platform': 'LinkedIn',
+    'target_city': 'Bangalore',
+    'target_age_group': '28-35',
+    'character_count': 150,
+    'readability_score': 8.0,
+    'brand_consistency_score': 9.0,
+    'accessibility_score': 8.5
+}
+
+# Alternatives tried by optimize_campaign for each tunable parameter
+OPTIMIZATION_THEMES = ('Job Security', 'Career Growth', 'AI/ML Skills', 'Salary Boost')
+OPTIMIZATION_PLATFORMS = ('Instagram', 'LinkedIn', 'YouTube', 'Facebook')
+
+# Baseline business metrics scaled by the predicted performance
+BASE_CTR = 0.025
+BASE_CONVERSION = 0.05
+BASE_ROAS = 3.2
+BASE_COST = 300
+
+# Per-platform (ctr, conversion, roas) adjustments applied to the business metrics
+PLATFORM_ADJUSTMENTS = {
+    'Instagram': (1.8, 1.7, 1.5),
+    'LinkedIn': (1.3, 1.2, 1.3),
+    'YouTube': (1.6, 1.4, 1.4),
+    'Facebook': (1.1, 1.0, 1.1),
+    'Google Ads': (1.5, 1.3, 1.3),
+    'Twitter': (0.7, 0.6, 0.8)
+}
+DEFAULT_PLATFORM_ADJUSTMENT = (1.0, 1.0, 1.0)
+
+# Performance multipliers per categorical value used to score synthetic samples
+SYNTHETIC_MULTIPLIERS = {
+    'brand_id': {'upgrad': 1.2, 'byju': 1.0, 'unacademy': 0.9, 'vedantu': 0.8},
+    'content_theme': {
+        'Job Security': 1.3, 'Career Growth': 1.2, 'AI/ML Skills': 1.1,
+        'Salary Boost': 1.1, 'Skill Development': 1.0
+    },
+    'platform': {
+        'Instagram': 1.4, 'LinkedIn': 1.3, 'YouTube': 1.2,
+        'Facebook': 1.1, 'Google Ads': 1.1, 'Twitter': 0.9
+    },
+    'target_city': {
+        'Hyderabad': 1.2, 'Bangalore': 1.15, 'Chennai': 1.1,
+        'Delhi NCR': 1.05, 'Mumbai': 1.0, 'Pune': 0.95
+    },
+    'target_age_group': {'35-42': 1.1, '28-35': 1.1, '22-28': 1.0, '42-50': 0.9}
+}
+
+@lru_cache(maxsize=8)
+def _load_pickle(path: str, mtime_ns: int, mmap_mode: Optional[str] = 'r') -> Any:
+    """Deserialize a saved pickle once per file version; instances share the loaded object"""
+    return joblib.load(path, mmap_mode=mmap_mode)
+
+def _load_saved(path: Path, mmap_mode: Optional[str] = 'r') -> Any:
+    """Load a saved pickle through the cache, keyed on its modification time"""
+    return _load_pickle(str(path), path.stat().st_mtime_ns, mmap_mode)
+
+def _replace_file(path: Path, write: Callable[[str], Any]):
+    """Write a file under a temporary name and swap it in, so readers and memory maps never see a partial file"""
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    os.close(fd)
+    try:
+        write(temp_path)
+        os.replace(temp_path, path)
+    except BaseException:
+        Path(temp_path).unlink(missing_ok=True)
+        raise
+
 class CampaignOptimizer:
     """
     ML-powered campaign optimization system
@@ -35,28 +194,83 @@ class CampaignOptimizer:
     def __init__(self, data_path: str = "main idea"):
         self.data_path = Path(data_path)
         self.model = None
-        self.encoders = {}
+        self.encoder = None
+        self._feature_cols = None
+        self._category_codes = None
         self.scaler = None
+        self.interval_models = []
+        self.ort_session = None
         self.is_trained = False
         self.feature_importance = {}
-        self.performance_history = []
+        self._feedback_queue = queue.Queue()
+        self._feedback_lock = threading.Lock()
+        self._feedback_writer = None
+        self._model_lock = threading.Lock()
+        self._model_loader = None
         
         # Initialize models if sklearn is available
         if SKLEARN_AVAILABLE:
-            self.model = RandomForestRegressor(
-                n_estimators=100, 
-                random_state=42,
-                max_depth=10,
-                min_samples_split=5
-            )
-            self.scaler = StandardScaler()
+            self.model, self.interval_models, self.scaler, self.encoder = self._new_estimators()
+        
+    @staticmethod
+    def _new_estimators() -> Tuple[Any, List[Any], Any, Any]:
+        """Unfitted model, quantile bounds, scaler and encoder for one training run"""
+        model = HistGradientBoostingRegressor(**MODEL_PARAMS)
+        interval_models = [
+            HistGradientBoostingRegressor(loss='quantile', quantile=quantile, **MODEL_PARAMS)
+            for quantile in CONFIDENCE_QUANTILES
+        ]
+        scaler = StandardScaler()
+        # Unseen categories at prediction time encode to -1
+        encoder = OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1, dtype=np.float32)
+        return model, interval_models, scaler, encoder
+    
+    @cached_property
+    def performance_history(self) -> List[Dict[str, Any]]:
+        """Feedback recorded so far, read from the feedback logs on first use"""
+        # Entries recorded before the first read are only in the log, so make sure they are written
+        self.flush_feedback()
+        with self._feedback_lock:
+            self._migrate_legacy_feedback()
         
-        # Load training data and train model
-        self._initialize_model()
+        history = []
+        # Rotated segments sort before the active log, so entries stay in order; a segment that is
+        # being compressed is read from its finished .gz only
+        segments = sorted(
+            path for path in self.data_path.glob(f"{Path(FEEDBACK_FILE).stem}*")
+            if path.suffix == '.gz' or (path.suffix == '.jsonl' and not path.with_name(path.name + '.gz').exists())
+        )
+        for segment in segments:
+            try:
+                opener = gzip.open if segment.suffix == '.gz' else open
+                with opener(segment, 'rt', encoding='utf-8') as f:
+                    history.extend(_json_loads(line) for line in f if line.strip())
+            except Exception as e:
+                logger.error("Error loading feedback history from %s: %s", segment, e)
+        return history
+    
+    @property
+    def model_ready(self) -> bool:
+        """Whether a model is loaded; the first check starts loading or training one in the background"""
+        if not self.is_trained:
+            self.start_model_loading()
+        return self.is_trained
+    
+    def start_model_loading(self):
+        """Load or train the model on a background thread, once, so no request waits on training"""
+        with self._model_lock:
+            if self._model_loader is None:
+                self._model_loader = threading.Thread(target=self._initialize_model, name="model-loader", daemon=True)
+                self._model_loader.start()
     
     def _initialize_model(self):
         """Initialize and train the ML model"""
         try:
+            # Reuse the saved model when it was trained on the current training data
+            source_hash = self._training_source_hash()
+            if self._saved_training_hash() == source_hash and self._load_model():
+                return
+            
             # Load training data
             training_data = self._load_training_data()
             
@@ -68,145 +282,101 @@ class CampaignOptimizer:
                 logger.warning("No training data found, creating synthetic data")
                 synthetic_data = self._create_synthetic_training_data()
                 self.train_model(synthetic_data)
+            
+            if self.is_trained:
+                (self.data_path / TRAINING_HASH_FILE).write_text(source_hash)
                 
         except Exception as e:
-            logger.error(f"Error initializing model: {e}")
+            logger.error("Error initializing model: %s", e)
             self.is_trained = False
     
+    def _training_source_hash(self) -> str:
+        """Fingerprint of the data the model would be trained on"""
+        excel_file = self.data_path / TRAINING_DATA_FILE
+        if not excel_file.exists():
+            return SYNTHETIC_DATA_VERSION
+        
+        digest = hashlib.sha256()
+        with open(excel_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _saved_training_hash(self) -> Optional[str]:
+        """Fingerprint stored next to the saved model, if any"""
+        try:
+            return (self.data_path / TRAINING_HASH_FILE).read_text().strip()
+        except OSError:
+            return None
+    
     def _load_training_data(self) -> Optional[pd.DataFrame]:
         """Load ML training data from Excel file"""
         try:
-            excel_file = self.data_path / "intelligent_marketing_automation_data.xlsx"
+            excel_file = self.data_path / TRAINING_DATA_FILE
             if excel_file.exists():
                 # Try to load ML training data sheet
                 df = pd.read_excel(excel_file, sheet_name="ML_Training_Data")
-                logger.info(f"Loaded training data: {df.shape[0]} samples")
+                logger.info("Loaded training data: %s samples", df.shape[0])
                 return df
             else:
-                logger.warning(f"Training data file not found: {excel_file}")
+                logger.warning("Training data file not found: %s", excel_file)
                 return None
                 
         except Exception as e:
-            logger.error(f"Error loading training data: {e}")
+            logger.error("Error loading training data: %s", e)
             return None
     
     def _create_synthetic_training_data(self) -> pd.DataFrame:
         """Create synthetic training data for development"""
         
-        np.random.seed(42)
+        rng = np.random.default_rng(42)
         n_samples = 500
         
-        # Define possible values for categorical features
-        brands = ['upgrad', 'byju', 'unacademy', 'vedantu']
-        content_themes = ['AI/ML Skills', 'Career Growth', 'Job Security', 'Salary Boost', 'Skill Development']
-        visual_styles = ['Modern', 'Professional', 'Creative', 'Minimalist']
-        emotions = ['Motivation', 'Urgency', 'Confidence', 'Aspiration']
-        campaign_types = ['Email', 'Social Media', 'Display Ads']
-        platforms = ['Facebook', 'Instagram', 'LinkedIn', 'Twitter', 'YouTube', 'Google Ads']
-        cities = ['Bangalore', 'Mumbai', 'Delhi NCR', 'Hyderabad', 'Chennai', 'Pune']
-        age_groups = ['22-28', '28-35', '35-42', '42-50']
-        
-        # Generate synthetic data
-        data = []
-        for i in range(n_samples):
-            # Categorical features
-            brand = np.random.choice(brands)
-            content_theme = np.random.choice(content_themes)
-            visual_style = np.random.choice(visual_styles)
-            target_emotion = np.random.choice(emotions)
-            campaign_type = np.random.choice(campaign_types)
-            platform = np.random.choice(platforms)
-            target_city = np.random.choice(cities)
-            age_group = np.random.choice(age_groups)
-            
-            # Numerical features
-            character_count = np.random.randint(50, 300)
-            readability_score = np.random.uniform(6.0, 12.0)
-            brand_consistency_score = np.random.uniform(7.0, 10.0)
-            accessibility_score = np.random.uniform(8.0, 10.0)
-            
-            # Calculate performance score based on feature interactions
-            performance_score = self._calculate_synthetic_performance(
-                brand, content_theme, visual_style, target_emotion,
-                campaign_type, platform, target_city, age_group,
-                character_count, readability_score, brand_consistency_score, accessibility_score
-            )
+        # Categorical features, one column at a time
+        data = {}
+        performance_score = np.full(n_samples, 5.0)
+        for feature, values in SYNTHETIC_CATEGORIES.items():
+            categories = sorted(values)
+            codes = rng.integers(0, len(categories), n_samples)
+            data[feature] = pd.Categorical.from_codes(codes, categories=categories)
             
-            data.append({
-                'brand_id': brand,
-                'content_theme': content_theme,
-                'visual_style': visual_style,
-                'target_emotion': target_emotion,
-                'campaign_type': campaign_type,
-                'platform': platform,
-                'target_city': target_city,
-                'target_age_group': age_group,
-                'character_count': character_count,
-                'readability_score': readability_score,
-                'brand_consistency_score': brand_consistency_score,
-                'accessibility_score': accessibility_score,
-                'performance_score': performance_score
-            })
+            # Feature interactions scale the base score
+            multipliers = SYNTHETIC_MULTIPLIERS.get(feature)
+            if multipliers:
+                performance_score *= np.array([multipliers.get(value, 1.0) for value in categories])[codes]
         
-        df = pd.DataFrame(data)
-        logger.info(f"Created synthetic training data: {df.shape[0]} samples")
-        return df
-    
-    def _calculate_synthetic_performance(self, brand, content_theme, visual_style, target_emotion,
-                                       campaign_type, platform, target_city, age_group,
-                                       character_count, readability_score, brand_consistency_score, accessibility_score) -> float:
-        """Calculate synthetic performance score based on feature interactions"""
-        
-        base_score = 5.0
-        
-        # Brand multipliers
-        brand_multipliers = {'upgrad': 1.2, 'byju': 1.0, 'unacademy': 0.9, 'vedantu': 0.8}
-        base_score *= brand_multipliers.get(brand, 1.0)
-        
-        # Content theme impact
-        theme_multipliers = {
-            'Job Security': 1.3, 'Career Growth': 1.2, 'AI/ML Skills': 1.1,
-            'Salary Boost': 1.1, 'Skill Development': 1.0
-        }
-        base_score *= theme_multipliers.get(content_theme, 1.0)
-        
-        # Platform performance
-        platform_multipliers = {
-            'Instagram': 1.4, 'LinkedIn': 1.3, 'YouTube': 1.2,
-            'Facebook': 1.1, 'Google Ads': 1.1, 'Twitter': 0.9
-        }
-        base_score *= platform_multipliers.get(platform, 1.0)
-        
-        # City performance (based on market data)
-        city_multipliers = {
-            'Hyderabad': 1.2, 'Bangalore': 1.15, 'Chennai': 1.1,
-            'Delhi NCR': 1.05, 'Mumbai': 1.0, 'Pune': 0.95
-        }
-        base_score *= city_multipliers.get(target_city, 1.0)
-        
-        # Age group preferences
-        age_multipliers = {'35-42': 1.1, '28-35': 1.1, '22-28': 1.0, '42-50': 0.9}
-        base_score *= age_multipliers.get(age_group, 1.0)
+        # Numerical features
+        character_count = rng.integers(50, 300, n_samples, dtype=np.int32)
+        readability_score = rng.uniform(6.0, 12.0, n_samples).astype(np.float32)
+        brand_consistency_score = rng.uniform(7.0, 10.0, n_samples).astype(np.float32)
+        accessibility_score = rng.uniform(8.0, 10.0, n_samples).astype(np.float32)
         
         # Numerical feature impacts
-        if readability_score > 8:
-            base_score *= 1.1
-        if brand_consistency_score > 9:
-            base_score *= 1.15
-        if accessibility_score > 9:
-            base_score *= 1.05
+        performance_score *= np.where(readability_score > 8, 1.1, 1.0)
+        performance_score *= np.where(brand_consistency_score > 9, 1.15, 1.0)
+        performance_score *= np.where(accessibility_score > 9, 1.05, 1.0)
         
         # Character count optimization (sweet spot around 150-200)
-        if 150 <= character_count <= 200:
-            base_score *= 1.1
-        elif character_count < 100 or character_count > 250:
-            base_score *= 0.9
+        performance_score *= np.select(
+            [(character_count >= 150) & (character_count <= 200), (character_count < 100) | (character_count > 250)],
+            [1.1, 0.9],
+            default=1.0
+        )
+        
+        # Add some noise and keep scores within reasonable bounds
+        performance_score += rng.normal(0, 0.3, n_samples)
         
-        # Add some noise
-        base_score += np.random.normal(0, 0.3)
+        data.update({
+            'character_count': character_count,
+            'readability_score': readability_score,
+            'brand_consistency_score': brand_consistency_score,
+            'accessibility_score': accessibility_score,
+            'performance_score': np.clip(performance_score, 1.0, 10.0)
+        })
         
-        # Ensure score is within reasonable bounds
-        return max(1.0, min(10.0, base_score))
+        df = pd.DataFrame(data)
+        logger.info("Created synthetic training data: %s samples", df.shape[0])
+        return df
     
     def train_model(self, training_data: pd.DataFrame) -> Dict[str, Any]:
         """Train the optimization model on campaign data"""
@@ -216,8 +386,14 @@ class CampaignOptimizer:
             return {"error": "ML libraries not available"}
         
         try:
+            # Fit new estimators; the current ones may be shared with other instances through the
+            # pickle cache, so they are replaced once training succeeds rather than refitted in place
+            model, interval_models, scaler, encoder = self._new_estimators()
+            
             # Prepare features and target
-            features_df = self._prepare_features(training_data)
+            features_df = self._prepare_features(training_data, encoder, [
+                feature for feature in CATEGORICAL_FEATURES + NUMERICAL_FEATURES if feature in training_data.columns
+            ])
             target = training_data['performance_score']
             
             # Split data
@@ -226,25 +402,33 @@ class CampaignOptimizer:
             )
             
             # Scale numerical features
-            X_train_scaled = self.scaler.fit_transform(X_train)
-            X_test_scaled = self.scaler.transform(X_test)
+            X_train_scaled = scaler.fit_transform(X_train)
+            X_test_scaled = scaler.transform(X_test)
             
-            # Train the model
-            self.model.fit(X_train_scaled, y_train)
+            # Train the model and the quantile bounds used for confidence
+            model.fit(X_train_scaled, y_train)
+            for interval_model in interval_models:
+                interval_model.fit(X_train_scaled, y_train)
             
             # Evaluate model
-            train_score = self.model.score(X_train_scaled, y_train)
-            test_score = self.model.score(X_test_scaled, y_test)
+            train_score = model.score(X_train_scaled, y_train)
+            test_score = model.score(X_test_scaled, y_test)
             
             # Cross-validation
-            cv_scores = cross_val_score(self.model, X_train_scaled, y_train, cv=5)
+            cv_scores = cross_val_score(model, X_train_scaled, y_train, cv=5)
             
-            # Feature importance
+            # Feature importance (boosted models expose none, so measure it on the held-out split)
             feature_names = features_df.columns.tolist()
-            self.feature_importance = dict(zip(feature_names, self.model.feature_importances_))
+            importance = permutation_importance(model, X_test_scaled, y_test, n_repeats=5, random_state=42)
             
-            # Mark as trained
+            # Swap in the new model, mark as trained and drop predictions from any previous model
+            self.model, self.interval_models, self.scaler, self.encoder = model, interval_models, scaler, encoder
+            self._feature_cols = feature_names
+            self.feature_importance = dict(zip(feature_names, importance.importances_mean.tolist()))
+            self.ort_session = None
             self.is_trained = True
+            self._category_codes = None
+            self._predict_cached.cache_clear()
             
             # Save model
             self._save_model()
@@ -259,115 +443,131 @@ class CampaignOptimizer:
                 "feature_importance": {k: round(v, 3) for k, v in self.feature_importance.items()}
             }
             
-            logger.info(f"Model trained successfully: R² = {test_score:.3f}")
+            logger.info("Model trained successfully: R² = %.3f", test_score)
             return results
             
         except Exception as e:
-            logger.error(f"Error training model: {e}")
+            logger.error("Error training model: %s", e)
             return {"error": str(e)}
     
-    def _prepare_features(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Prepare features for ML model"""
+    def _prepare_features(self, df: pd.DataFrame, encoder: Any = None,
+                          feature_cols: Optional[List[str]] = None) -> pd.DataFrame:
+        """Prepare features for ML model, with the current encoder and columns unless training passes new ones"""
         
-        categorical_features = [
-            'brand_id', 'content_theme', 'visual_style', 'target_emotion',
-            'campaign_type', 'platform', 'target_city', 'target_age_group'
-        ]
-        
-        numerical_features = [
-            'character_count', 'readability_score', 
-            'brand_consistency_score', 'accessibility_score'
-        ]
+        encoder = self.encoder if encoder is None else encoder
+        feature_cols = self._feature_cols if feature_cols is None else feature_cols
         
         processed_df = df.copy()
         
-        # Encode categorical features
-        for feature in categorical_features:
-            if feature in processed_df.columns:
-                if feature not in self.encoders:
-                    self.encoders[feature] = LabelEncoder()
-                    processed_df[feature] = self.encoders[feature].fit_transform(
-                        processed_df[feature].astype(str)
-                    )
-                else:
-                    # Handle unseen categories
-                    le = self.encoders[feature]
-                    processed_df[feature] = processed_df[feature].astype(str)
-                    
-                    # Map unseen categories to a default value
-                    mask = ~processed_df[feature].isin(le.classes_)
-                    processed_df.loc[mask, feature] = le.classes_[0]  # Use first class as default
-                    
-                    processed_df[feature] = le.transform(processed_df[feature])
+        # Encode all categorical features in one pass; a new encoder is fitted on the training data
+        if hasattr(encoder, 'categories_'):
+            encoded_features = list(encoder.feature_names_in_)
+            processed_df[encoded_features] = encoder.transform(processed_df[encoded_features].astype(str))
+        else:
+            encoded_features = [feature for feature in CATEGORICAL_FEATURES if feature in processed_df.columns]
+            if encoded_features:
+                processed_df[encoded_features] = encoder.fit_transform(processed_df[encoded_features].astype(str))
         
-        # Select available features
-        available_features = []
-        for feature in categorical_features + numerical_features:
-            if feature in processed_df.columns:
-                available_features.append(feature)
+        if feature_cols is None:
+            feature_cols = [
+                feature for feature in CATEGORICAL_FEATURES + NUMERICAL_FEATURES if feature in processed_df.columns
+            ]
         
-        return processed_df[available_features]
+        # Keep features float32 end to end, matching the ONNX input
+        return processed_df[feature_cols].astype(np.float32)
 
     def predict_performance(self, campaign_params: Dict[str, Any]) -> Dict[str, Any]:
         """Predict campaign performance based on parameters"""
 
-        if not self.is_trained:
-            # Try to load pre-trained model
-            if not self._load_model():
-                return {"error": "Model not trained and no saved model available"}
+        if not self.model_ready:
+            # Callers fall back to their default estimates until the background load finishes
+            return {"error": "Model is not ready yet"}
 
         try:
-            # Create feature vector from parameters
-            feature_df = self._create_feature_dataframe(campaign_params)
-
-            # Scale features
-            features_scaled = self.scaler.transform(feature_df)
-
-            # Predict performance
-            predicted_score = self.model.predict(features_scaled)[0]
-
-            # Convert to business metrics
-            business_metrics = self._convert_to_business_metrics(predicted_score, campaign_params)
-
-            # Calculate confidence
-            confidence = self._calculate_prediction_confidence(feature_df)
+            # Identical parameter sets (dashboard refreshes, optimization sweeps) reuse the prediction
+            try:
+                prediction = self._predict_cached(tuple(sorted(campaign_params.items())))
+            except TypeError:
+                # Unhashable parameter values cannot be cached
+                prediction = self._compute_prediction(campaign_params)
 
             return {
-                "predicted_performance_score": round(predicted_score, 2),
-                "business_metrics": business_metrics,
-                "confidence_level": round(confidence, 2),
-                "feature_contributions": self._get_feature_contributions(feature_df),
+                **prediction,
+                "business_metrics": dict(prediction["business_metrics"]),
+                "feature_contributions": dict(prediction["feature_contributions"]),
                 "timestamp": datetime.now().isoformat()
             }
 
         except Exception as e:
-            logger.error(f"Error predicting performance: {e}")
+            logger.error("Error predicting performance: %s", e)
             return {"error": f"Prediction failed: {str(e)}"}
 
-    def _create_feature_dataframe(self, params: Dict[str, Any]) -> pd.DataFrame:
-        """Create feature dataframe from campaign parameters"""
-
-        # Default values for missing parameters
-        defaults = {
-            'brand_id': 'upgrad',
-            'content_theme': 'Career Growth',
-            'visual_style': 'Professional',
-            'target_emotion': 'Motivation',
-            'campaign_type': 'Email',
-            'platform': 'LinkedIn',
-            'target_city': 'Bangalore',
-            'target_age_group': '28-35',
-            'character_count': 150,
-            'readability_score': 8.0,
-            'brand_consistency_score': 9.0,
-            'accessibility_score': 8.5
-        }
+    @lru_cache(maxsize=4096)
+    def _predict_cached(self, params_items: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
+        """Prediction for a hashable parameter set; cleared whenever the model changes"""
+        return self._compute_prediction(dict(params_items))
+
+    def _compute_prediction(self, campaign_params: Dict[str, Any]) -> Dict[str, Any]:
+        """Run the model for one set of campaign parameters"""
+
+        if self._feature_cols is None or not hasattr(self.encoder, 'categories_') or not hasattr(self.scaler, 'mean_'):
+            return self._compute_predictions([campaign_params])[0]
+
+        # Single rows skip pandas: encode and scale the row directly
+        features = self._encode_row(campaign_params)
+        features_scaled = ((features - self.scaler.mean_) / self.scaler.scale_).astype(np.float32)
+        return self._build_predictions([campaign_params], features, features_scaled)[0]
+
+    def _compute_predictions(self, params_list: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Run the model once over every set of campaign parameters"""
+
+        # Create one feature row per parameter set
+        feature_df = self._create_feature_batch(params_list)
+
+        # Scale features
+        features_scaled = self.scaler.transform(feature_df)
+
+        return self._build_predictions(params_list, feature_df.to_numpy(), features_scaled)
+
+    def _build_predictions(self, params_list: List[Dict[str, Any]], features: np.ndarray,
+                           features_scaled: np.ndarray) -> List[Dict[str, Any]]:
+        """Predict performance and confidence for the whole batch and assemble the results"""
+
+        predicted_scores = self._predict_scores(features_scaled)
+        confidences = self._calculate_prediction_confidence(features_scaled)
+
+        return [
+            {
+                "predicted_performance_score": round(float(score), 2),
+                "business_metrics": self._convert_to_business_metrics(float(score), params),
+                "confidence_level": round(float(confidence), 2),
+                "feature_contributions": self._get_feature_contributions(dict(zip(self._feature_cols, row.tolist())))
+            }
+            for params, row, score, confidence in zip(params_list, features, predicted_scores, confidences)
+        ]
 
-        # Merge with defaults
-        feature_data = {**defaults, **params}
+    def _encode_row(self, params: Dict[str, Any]) -> np.ndarray:
+        """Encode one set of campaign parameters into a float32 feature row"""
 
-        # Create dataframe
-        df = pd.DataFrame([feature_data])
+        # Per-feature category codes, matching the fitted encoder (unseen categories encode to -1)
+        if self._category_codes is None:
+            self._category_codes = {
+                feature: {label: code for code, label in enumerate(categories)}
+                for feature, categories in zip(self.encoder.feature_names_in_, self.encoder.categories_)
+            }
+
+        merged = {**FEATURE_DEFAULTS, **params}
+        row = np.empty((1, len(self._feature_cols)), dtype=np.float32)
+        for index, feature in enumerate(self._feature_cols):
+            codes = self._category_codes.get(feature)
+            row[0, index] = codes.get(str(merged[feature]), -1) if codes is not None else merged[feature]
+        return row
+
+    def _create_feature_batch(self, params_list: List[Dict[str, Any]]) -> pd.DataFrame:
+        """Create one feature dataframe row per set of campaign parameters"""
+
+        # Merge with defaults for missing parameters
+        df = pd.DataFrame([{**FEATURE_DEFAULTS, **params} for params in params_list])
 
         # Prepare features using the same method as training
         return self._prepare_features(df)
@@ -375,33 +575,19 @@ class CampaignOptimizer:
     def _convert_to_business_metrics(self, performance_score: float, params: Dict[str, Any]) -> Dict[str, str]:
         """Convert performance score to business metrics"""
 
-        # Base metrics
-        base_ctr = 0.025
-        base_conversion = 0.05
-        base_roas = 3.2
-        base_cost = 300
-
         # Performance multiplier (normalize score to 0.5-2.0 range)
         multiplier = 0.5 + (performance_score / 10.0) * 1.5
 
         # Platform adjustments
-        platform = params.get('platform', 'LinkedIn')
-        platform_adjustments = {
-            'Instagram': {'ctr': 1.8, 'conversion': 1.7, 'roas': 1.5},
-            'LinkedIn': {'ctr': 1.3, 'conversion': 1.2, 'roas': 1.3},
-            'YouTube': {'ctr': 1.6, 'conversion': 1.4, 'roas': 1.4},
-            'Facebook': {'ctr': 1.1, 'conversion': 1.0, 'roas': 1.1},
-            'Google Ads': {'ctr': 1.5, 'conversion': 1.3, 'roas': 1.3},
-            'Twitter': {'ctr': 0.7, 'conversion': 0.6, 'roas': 0.8}
-        }
-
-        platform_adj = platform_adjustments.get(platform, {'ctr': 1.0, 'conversion': 1.0, 'roas': 1.0})
+        ctr_adj, conversion_adj, roas_adj = PLATFORM_ADJUSTMENTS.get(
+            params.get('platform', 'LinkedIn'), DEFAULT_PLATFORM_ADJUSTMENT
+        )
 
         # Calculate final metrics
-        final_ctr = base_ctr * multiplier * platform_adj['ctr']
-        final_conversion = base_conversion * multiplier * platform_adj['conversion']
-        final_roas = base_roas * multiplier * platform_adj['roas']
-        final_cost = base_cost / multiplier
+        final_ctr = BASE_CTR * multiplier * ctr_adj
+        final_conversion = BASE_CONVERSION * multiplier * conversion_adj
+        final_roas = BASE_ROAS * multiplier * roas_adj
+        final_cost = BASE_COST / multiplier
 
         return {
             'ctr': f"{final_ctr * 100:.1f}%",
@@ -410,38 +596,41 @@ class CampaignOptimizer:
             'cost_per_conversion': f"₹{int(final_cost)}"
         }
 
-    def _calculate_prediction_confidence(self, feature_df: pd.DataFrame) -> float:
-        """Calculate confidence level for the prediction"""
+    def _predict_scores(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Predict scores for scaled feature rows, through ONNX Runtime when a compiled model is loaded"""
 
-        if not SKLEARN_AVAILABLE or not hasattr(self.model, 'estimators_'):
-            return 0.75  # Default confidence
+        if self.ort_session is not None:
+            X = np.asarray(features_scaled, dtype=np.float32)
+            return self.ort_session.run(None, {'X': X})[0].ravel()
+        return self.model.predict(features_scaled)
+
+    def _calculate_prediction_confidence(self, features_scaled: np.ndarray) -> np.ndarray:
+        """Calculate confidence level for each scaled feature row"""
+
+        n_rows = len(features_scaled)
+        if not SKLEARN_AVAILABLE or len(self.interval_models) != 2:
+            return np.full(n_rows, 0.75)  # Default confidence
 
         try:
-            # Get predictions from all trees
-            features_scaled = self.scaler.transform(feature_df)
-            tree_predictions = [tree.predict(features_scaled)[0] for tree in self.model.estimators_]
+            # Predict the quantile band for the whole batch
+            lower, upper = (interval_model.predict(features_scaled) for interval_model in self.interval_models)
 
-            # Calculate variance
-            prediction_variance = np.var(tree_predictions)
+            # Estimate the variance from the 10-90% band width (about 2.563 standard deviations)
+            prediction_variance = ((upper - lower) / 2.563) ** 2
 
             # Convert variance to confidence (lower variance = higher confidence)
-            confidence = max(0.5, min(0.95, 1.0 - (prediction_variance / 10.0)))
-
-            return confidence
+            return np.clip(1.0 - (prediction_variance / 10.0), 0.5, 0.95)
 
         except Exception as e:
-            logger.error(f"Error calculating confidence: {e}")
-            return 0.75
+            logger.error("Error calculating confidence: %s", e)
+            return np.full(n_rows, 0.75)
 
-    def _get_feature_contributions(self, feature_df: pd.DataFrame) -> Dict[str, float]:
+    def _get_feature_contributions(self, feature_values: Dict[str, float]) -> Dict[str, float]:
         """Get feature contributions to the prediction"""
 
         if not self.feature_importance:
             return {}
 
-        # Get feature values
-        feature_values = feature_df.iloc[0].to_dict()
-
         # Calculate contributions based on feature importance and values
         contributions = {}
         for feature, importance in self.feature_importance.items():
@@ -455,40 +644,29 @@ class CampaignOptimizer:
     def optimize_campaign(self, base_params: Dict[str, Any]) -> Dict[str, Any]:
         """Suggest optimizations for campaign parameters"""
 
-        if not self.is_trained:
+        if not self.model_ready:
             return {"error": "Model not trained"}
 
         try:
-            base_prediction = self.predict_performance(base_params)
-            base_score = base_prediction.get('predicted_performance_score', 0)
-
-            optimizations = []
-
-            # Test different content themes
-            for theme in ['Job Security', 'Career Growth', 'AI/ML Skills', 'Salary Boost']:
-                test_params = base_params.copy()
-                test_params['content_theme'] = theme
-                prediction = self.predict_performance(test_params)
-
-                optimizations.append({
-                    'parameter': 'content_theme',
-                    'value': theme,
-                    'predicted_score': prediction.get('predicted_performance_score', 0),
-                    'improvement': prediction.get('predicted_performance_score', 0) - base_score
-                })
-
-            # Test different platforms
-            for platform in ['Instagram', 'LinkedIn', 'YouTube', 'Facebook']:
-                test_params = base_params.copy()
-                test_params['platform'] = platform
-                prediction = self.predict_performance(test_params)
-
-                optimizations.append({
-                    'parameter': 'platform',
-                    'value': platform,
-                    'predicted_score': prediction.get('predicted_performance_score', 0),
-                    'improvement': prediction.get('predicted_performance_score', 0) - base_score
-                })
+            # Score the base campaign and every single-parameter variant in one batch
+            candidates = [('content_theme', theme) for theme in OPTIMIZATION_THEMES]
+            candidates += [('platform', platform) for platform in OPTIMIZATION_PLATFORMS]
+
+            feature_df = self._create_feature_batch(
+                [base_params] + [{**base_params, parameter: value} for parameter, value in candidates]
+            )
+            scores = np.round(self._predict_scores(self.scaler.transform(feature_df)), 2)
+            base_score = float(scores[0])
+
+            optimizations = [
+                {
+                    'parameter': parameter,
+                    'value': value,
+                    'predicted_score': float(score),
+                    'improvement': float(score) - base_score
+                }
+                for (parameter, value), score in zip(candidates, scores[1:])
+            ]
 
             # Sort by improvement
             optimizations.sort(key=lambda x: x['improvement'], reverse=True)
@@ -504,7 +682,7 @@ class CampaignOptimizer:
             }
 
         except Exception as e:
-            logger.error(f"Error optimizing campaign: {e}")
+            logger.error("Error optimizing campaign: %s", e)
             return {"error": f"Optimization failed: {str(e)}"}
 
     def _save_model(self):
@@ -514,14 +692,57 @@ class CampaignOptimizer:
                 model_path = self.data_path / "campaign_optimizer_model.pkl"
                 encoders_path = self.data_path / "campaign_encoders.pkl"
                 scaler_path = self.data_path / "campaign_scaler.pkl"
+                interval_path = self.data_path / "campaign_interval_models.pkl"
+                importance_path = self.data_path / "campaign_feature_importance.pkl"
 
-                joblib.dump(self.model, model_path)
-                joblib.dump(self.encoders, encoders_path)
-                joblib.dump(self.scaler, scaler_path)
+                # Uncompressed so the arrays can be memory-mapped on load; each file is replaced rather
+                # than truncated, since other workers may still have the previous version mapped
+                for value, path in [(self.model, model_path), (self.encoder, encoders_path),
+                                    (self.scaler, scaler_path), (self.interval_models, interval_path)]:
+                    _replace_file(path, lambda temp_path, value=value: joblib.dump(value, temp_path, compress=0))
+                _replace_file(importance_path, lambda temp_path: joblib.dump(self.feature_importance, temp_path))
+                self._export_onnx()
 
                 logger.info("Model saved successfully")
         except Exception as e:
-            logger.error(f"Error saving model: {e}")
+            logger.error("Error saving model: %s", e)
+
+    def _export_onnx(self):
+        """Compile the fitted model to ONNX and serve predictions from ONNX Runtime"""
+        self.ort_session = None
+        if not ONNX_AVAILABLE:
+            return
+
+        onnx_path = self.data_path / ONNX_MODEL_FILE
+        try:
+            onnx_model = convert_sklearn(
+                self.model,
+                initial_types=[('X', FloatTensorType([None, self.scaler.n_features_in_]))]
+            )
+            onnx_bytes = onnx_model.SerializeToString()
+            _replace_file(onnx_path, lambda temp_path: Path(temp_path).write_bytes(onnx_bytes))
+            self.ort_session = ort.InferenceSession(onnx_bytes, providers=['CPUExecutionProvider'])
+        except Exception as e:
+            logger.warning("ONNX export failed, using scikit-learn inference: %s", e)
+            # A compiled copy of an earlier model must not be picked up by the next load
+            onnx_path.unlink(missing_ok=True)
+
+    def _load_onnx(self, model_path: Path):
+        """Load the compiled model saved alongside the pickles, exporting it if missing or stale"""
+        self.ort_session = None
+        if not ONNX_AVAILABLE:
+            return
+
+        # The export is written after the model pickle, so an older file was compiled from an earlier model
+        onnx_path = self.data_path / ONNX_MODEL_FILE
+        if not onnx_path.exists() or onnx_path.stat().st_mtime_ns < model_path.stat().st_mtime_ns:
+            self._export_onnx()
+            return
+
+        try:
+            self.ort_session = ort.InferenceSession(str(onnx_path), providers=['CPUExecutionProvider'])
+        except Exception as e:
+            logger.warning("Could not load ONNX model, using scikit-learn inference: %s", e)
 
     def _load_model(self) -> bool:
         """Load pre-trained model and encoders"""
@@ -529,12 +750,28 @@ class CampaignOptimizer:
             model_path = self.data_path / "campaign_optimizer_model.pkl"
             encoders_path = self.data_path / "campaign_encoders.pkl"
             scaler_path = self.data_path / "campaign_scaler.pkl"
-
-            if all(path.exists() for path in [model_path, encoders_path, scaler_path]):
-                self.model = joblib.load(model_path)
-                self.encoders = joblib.load(encoders_path)
-                self.scaler = joblib.load(scaler_path)
+            interval_path = self.data_path / "campaign_interval_models.pkl"
+            importance_path = self.data_path / "campaign_feature_importance.pkl"
+
+            if all(path.exists() for path in [model_path, encoders_path, scaler_path, interval_path, importance_path]):
+                encoder = _load_saved(encoders_path)
+                if not isinstance(encoder, OrdinalEncoder):
+                    # Saved by an older version that kept one LabelEncoder per feature
+                    logger.warning("Saved encoders are outdated, retraining")
+                    return False
+                
+                # Memory-mapped: model arrays page in from the file cache on demand
+                self.model = _load_saved(model_path)
+                self.encoder = encoder
+                self.scaler = _load_saved(scaler_path)
+                # The scaler was fitted on the feature frame, so it records the column order
+                self._feature_cols = list(getattr(self.scaler, 'feature_names_in_', [])) or None
+                self.interval_models = _load_saved(interval_path)
+                self.feature_importance = dict(_load_saved(importance_path, None))
+                self._load_onnx(model_path)
                 self.is_trained = True
+                self._category_codes = None
+                self._predict_cached.cache_clear()
 
                 logger.info("Model loaded successfully")
                 return True
@@ -543,41 +780,153 @@ class CampaignOptimizer:
                 return False
 
         except Exception as e:
-            logger.error(f"Error loading model: {e}")
+            logger.error("Error loading model: %s", e)
             return False
 
+    def reload_model(self) -> bool:
+        """Drop cached pickles and load the saved model from disk again"""
+        _load_pickle.cache_clear()
+        return self._load_model()
+
     def get_model_info(self) -> Dict[str, Any]:
         """Get information about the trained model"""
 
         return {
             "is_trained": self.is_trained,
-            "model_type": "RandomForestRegressor" if SKLEARN_AVAILABLE else "Not Available",
+            "model_type": "HistGradientBoostingRegressor" if SKLEARN_AVAILABLE else "Not Available",
             "feature_importance": self.feature_importance,
             "sklearn_available": SKLEARN_AVAILABLE,
             "last_updated": datetime.now().isoformat()
         }
 
-    def add_performance_feedback(self, campaign_params: Dict[str, Any], actual_performance: float):
+    def add_performance_feedback(self, campaign_params: Dict[str, Any], actual_performance: float,
+                                 predicted_performance: Optional[float] = None):
         """Add actual performance feedback for continuous learning"""
 
+        # Callers that already scored the campaign pass the prediction in; otherwise only an
+        # already-trained model is asked, so recording feedback never triggers training
+        if predicted_performance is None and self.is_trained:
+            predicted_performance = self.predict_performance(campaign_params).get('predicted_performance_score')
+
         feedback_entry = {
             "timestamp": datetime.now().isoformat(),
             "campaign_params": campaign_params,
             "actual_performance": actual_performance,
-            "predicted_performance": self.predict_performance(campaign_params).get('predicted_performance_score')
+            "predicted_performance": predicted_performance
         }
 
-        self.performance_history.append(feedback_entry)
+        # History is only kept in memory once something has read it; recording never loads it
+        if 'performance_history' in self.__dict__:
+            self.performance_history.append(feedback_entry)
 
-        # Save feedback for future retraining
-        feedback_file = self.data_path / "performance_feedback.json"
+        # Queue the entry for the background writer, which appends it to the log for future retraining
         try:
-            with open(feedback_file, 'w') as f:
-                json.dump(self.performance_history, f, indent=2)
+            line = _feedback_line(feedback_entry)
+            self._start_feedback_writer()
+            self._feedback_queue.put(line)
 
             logger.info("Performance feedback added")
         except Exception as e:
-            logger.error(f"Error saving feedback: {e}")
+            logger.error("Error saving feedback: %s", e)
+
+    def flush_feedback(self):
+        """Stop the background writer once it has written its current batch and everything queued"""
+        with self._feedback_lock:
+            writer, self._feedback_writer = self._feedback_writer, None
+        if writer is not None:
+            # None tells the writer to stop; the next feedback entry starts a new one
+            self._feedback_queue.put(None)
+            writer.join()
+
+    def _start_feedback_writer(self):
+        """Start the background feedback writer on first use"""
+        with self._feedback_lock:
+            if self._feedback_writer is None:
+                self._migrate_legacy_feedback()
+                self._feedback_writer = threading.Thread(
+                    target=self._feedback_writer_loop, name="feedback-writer", daemon=True
+                )
+                self._feedback_writer.start()
+                # The writer is a daemon thread, so stop it cleanly at exit (registered once per instance)
+                atexit.unregister(self.flush_feedback)
+                atexit.register(self.flush_feedback)
+
+    def _feedback_writer_loop(self):
+        """Batch queued feedback lines and append them to the log until told to stop"""
+        stopping = False
+        while not stopping:
+            line = self._feedback_queue.get()
+            if line is None:
+                return
+            lines = [line]
+            size = len(line)
+            deadline = time.monotonic() + FEEDBACK_FLUSH_INTERVAL
+            while size < FEEDBACK_FLUSH_BYTES:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    line = self._feedback_queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if line is None:
+                    # Write the batch in hand before stopping
+                    stopping = True
+                    break
+                lines.append(line)
+                size += len(line)
+            self._write_feedback(lines)
+
+    def _migrate_legacy_feedback(self):
+        """Move feedback from the legacy JSON array into a log segment that sorts before newer ones"""
+        legacy_file = self.data_path / LEGACY_FEEDBACK_FILE
+        if not legacy_file.exists():
+            return
+
+        try:
+            entries = _json_loads(legacy_file.read_bytes())
+            feedback_file = self.data_path / FEEDBACK_FILE
+            segment = feedback_file.with_name(
+                f"{feedback_file.stem}-{datetime.fromtimestamp(legacy_file.stat().st_mtime):%Y%m%d%H%M%S%f}"
+                f"{feedback_file.suffix}"
+            )
+            data = b''.join(_feedback_line(entry) for entry in entries)
+            _replace_file(segment, lambda temp_path: Path(temp_path).write_bytes(data))
+            legacy_file.unlink()
+            logger.info("Migrated %s feedback entries from %s", len(entries), legacy_file)
+        except Exception as e:
+            logger.error("Error migrating legacy feedback from %s: %s", legacy_file, e)
+
+    def _write_feedback(self, lines: List[bytes]):
+        """Append a batch of encoded feedback lines in one write"""
+        feedback_file = self.data_path / FEEDBACK_FILE
+        try:
+            with self._feedback_lock:
+                with open(feedback_file, 'ab', buffering=FEEDBACK_FLUSH_BYTES) as f:
+                    f.write(b''.join(lines))
+                    size = f.tell()
+                
+                if size > FEEDBACK_ROTATE_BYTES:
+                    segment = feedback_file.with_name(
+                        f"{feedback_file.stem}-{datetime.now():%Y%m%d%H%M%S%f}{feedback_file.suffix}"
+                    )
+                    feedback_file.rename(segment)
+                    threading.Thread(target=self._compress_feedback_segment, args=(segment,), daemon=True).start()
+        except Exception as e:
+            logger.error("Error saving feedback: %s", e)
+
+    @staticmethod
+    def _compress_feedback_segment(segment: Path):
+        """Gzip a rotated feedback segment and remove the plain copy"""
+        compressed = segment.with_name(segment.name + '.gz')
+        partial = segment.with_name(segment.name + '.gz.part')
+        try:
+            with open(segment, 'rb') as src, gzip.open(partial, 'wb', compresslevel=FEEDBACK_GZIP_LEVEL) as dst:
+                shutil.copyfileobj(src, dst)
+            partial.replace(compressed)
+            segment.unlink()
+        except Exception as e:
+            logger.error("Error compressing feedback segment %s: %s", segment, e)
 
 # Global instance
 campaign_optimizer = CampaignOptimizer()
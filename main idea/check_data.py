@@ -5,8 +5,46 @@ Check and convert data files to CSV for better real-time processing
 
 import pandas as pd
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+# Rust-based calamine reader for workbooks; pandas only accepts engine="calamine" from 2.2
+try:
+    import python_calamine  # noqa: F401
+    EXCEL_ENGINE = "calamine" if tuple(int(part) for part in pd.__version__.split(".")[:2]) >= (2, 2) else None
+except ImportError:
+    EXCEL_ENGINE = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+def is_up_to_date(csv_file, source_file):
+    """True when the CSV exists and is newer than the workbook it was converted from"""
+    return csv_file.exists() and csv_file.stat().st_mtime >= source_file.stat().st_mtime
+
+def write_csv(df, csv_file):
+    """Write a dataframe to CSV, through pyarrow's native writer for frames it formats the same as pandas"""
+    if PYARROW_AVAILABLE:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            # pyarrow writes 1.0 as 1, True as true and its own timestamp format, which changes the
+            # dtypes read back from the CSV, so frames with such columns are left to pandas
+            if not any(
+                pa.types.is_floating(field.type) or pa.types.is_boolean(field.type) or pa.types.is_temporal(field.type)
+                for field in table.schema
+            ):
+                # Quote only where needed, as pandas does (pyarrow quotes every header and string by default)
+                pa_csv.write_csv(table, str(csv_file), pa_csv.WriteOptions(quoting_style="needed"))
+                return
+        except (pa.ArrowException, TypeError):
+            # Mixed-type object columns (such as embedded header rows) cannot become Arrow columns
+            pass
+    df.to_csv(csv_file, index=False)
+
 def check_and_convert_data():
     """Check Excel files and convert to CSV"""
     
@@ -17,15 +55,19 @@ def check_and_convert_data():
     if hiring_file.exists():
         print("📊 Loading company hiring data...")
         try:
-            df = pd.read_excel(hiring_file)
+            csv_file = data_dir / "company_hiring_data.csv"
+            if is_up_to_date(csv_file, hiring_file):
+                print(f"   ✅ CSV already up to date: {csv_file}")
+                df = pd.read_csv(csv_file)
+            else:
+                df = pd.read_excel(hiring_file, engine=EXCEL_ENGINE)
+                
+                # Convert to CSV
+                write_csv(df, csv_file)
+                print(f"   ✅ Converted to CSV: {csv_file}")
             print(f"   Shape: {df.shape}")
             print(f"   Columns: {list(df.columns)}")
             
-            # Convert to CSV
-            csv_file = data_dir / "company_hiring_data.csv"
-            df.to_csv(csv_file, index=False)
-            print(f"   ✅ Converted to CSV: {csv_file}")
-            
             # Show sample
             print("   Sample data:")
             print(df.head(3))
@@ -42,24 +84,35 @@ def check_and_convert_data():
     if marketing_file.exists():
         print("📈 Loading marketing automation data...")
         try:
-            # Try to read different sheets
-            xl_file = pd.ExcelFile(marketing_file)
+            # Try to read different sheets; the workbook is opened once and parsed per sheet
+            xl_file = pd.ExcelFile(marketing_file, engine=EXCEL_ENGINE)
             print(f"   Sheets: {xl_file.sheet_names}")
             
-            for sheet in xl_file.sheet_names:
-                df = pd.read_excel(marketing_file, sheet_name=sheet)
-                print(f"   Sheet '{sheet}': {df.shape}")
-                
-                # Convert to CSV
-                csv_file = data_dir / f"marketing_{sheet.lower()}.csv"
-                df.to_csv(csv_file, index=False)
-                print(f"   ✅ Converted to CSV: {csv_file}")
+            # Sheets are parsed in order while earlier sheets are written to CSV in the background
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                pending = []
+                for sheet in xl_file.sheet_names:
+                    csv_file = data_dir / f"marketing_{sheet.lower()}.csv"
+                    if is_up_to_date(csv_file, marketing_file):
+                        print(f"   ✅ CSV already up to date: {csv_file}")
+                        print()
+                        continue
+                    
+                    df = xl_file.parse(sheet)
+                    print(f"   Sheet '{sheet}': {df.shape}")
+                    
+                    # Convert to CSV
+                    pending.append((df, csv_file, executor.submit(write_csv, df, csv_file)))
                 
-                if df.shape[0] > 0:
-                    print(f"   Columns: {list(df.columns)}")
-                    print("   Sample data:")
-                    print(df.head(2))
-                print()
+                for df, csv_file, conversion in pending:
+                    conversion.result()
+                    print(f"   ✅ Converted to CSV: {csv_file}")
+                    
+                    if df.shape[0] > 0:
+                        print(f"   Columns: {list(df.columns)}")
+                        print("   Sample data:")
+                        print(df.head(2))
+                    print()
                 
         except Exception as e:
             print(f"   ❌ Error: {e}")
@@ -7,6 +7,7 @@ Industry-standard server startup with proper error handling
 import os
 import sys
 import subprocess
+import importlib.util
 import logging
 from pathlib import Path
 import uvicorn
@@ -29,11 +30,14 @@ def check_dependencies():
         'requests', 'python-dotenv', 'pydantic'
     ]
     
+    # Distribution names whose import name differs
+    import_names = {'python-dotenv': 'dotenv'}
+    
+    # find_spec only locates the package; it does not run its (slow) import
     missing_packages = []
     for package in required_packages:
-        try:
-            __import__(package.replace('-', '_'))
-        except ImportError:
+        module = import_names.get(package, package.replace('-', '_'))
+        if importlib.util.find_spec(module) is None:
             missing_packages.append(package)
     
     if missing_packages:
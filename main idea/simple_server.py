@@ -6,17 +6,31 @@ Industry-standard structure with working functionality
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
 import logging
 from pathlib import Path
 import asyncio
+import hashlib
+import zlib
+from collections import Counter
+from types import MappingProxyType
 import uvicorn
 import os
 from dotenv import load_dotenv
 
+try:
+    from diskcache import Cache
+except ImportError:
+    Cache = None
+
+try:
+    from rapidfuzz import fuzz, process, utils as fuzz_utils
+except ImportError:
+    process = None
+
 # Load environment variables
 load_dotenv("config/.env")
 
@@ -24,6 +38,111 @@ load_dotenv("config/.env")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Official and former city names that share too few letters with the name in the data to fuzzy-match
+CITY_ALIASES = MappingProxyType({
+    "bengaluru": "Bangalore",
+    "gurugram": "Gurgaon",
+    "bombay": "Mumbai",
+    "madras": "Chennai",
+    "calcutta": "Kolkata"
+})
+
+# Minimum similarity (0-100) for a fuzzy city-name match, enough for typos such as "Hyderbad"
+CITY_MATCH_SCORE_CUTOFF = 75
+
+# Gemini REST endpoint, called through a shared keep-alive session
+GEMINI_API_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash:generateContent"
+
+# Character limits per social platform, quoted in social prompts
+SOCIAL_CHAR_LIMITS = {'linkedin': 3000, 'instagram': 2200, 'facebook': 63206, 'twitter': 280}
+
+# Regional language elements per city used to flavour prompts (read-only)
+REGIONAL_LANGUAGE_MAP = MappingProxyType({
+    'Bangalore': {
+        'greeting': 'Namaskara',
+        'phrases': ['ಕೆಲಸ (kelasa - work)', 'ಭವಿಷ್ಯ (bhavishya - future)', 'ಯಶಸ್ಸು (yashassu - success)'],
+        'closing': 'Dhanyawadagalu',
+        'cultural': 'Silicon Valley of India, Tech hub, IT capital'
+    },
+    'Mumbai': {
+        'greeting': 'Namaste',
+        'phrases': ['काम (kaam - work)', 'सफलता (safalta - success)', 'भविष्य (bhavishya - future)'],
+        'closing': 'Dhanyawad',
+        'cultural': 'Financial capital, Bollywood, Dreams city'
+    },
+    'Delhi NCR': {
+        'greeting': 'Namaste',
+        'phrases': ['नौकरी (naukri - job)', 'कैरियर (career)', 'तरक्की (tarakki - progress)'],
+        'closing': 'Dhanyawad',
+        'cultural': 'Capital region, Government hub, Corporate center'
+    },
+    'Hyderabad': {
+        'greeting': 'Namaste',
+        'phrases': ['పని (pani - work)', 'భవిష్యత్తు (bhavishyattu - future)', 'విజయం (vijayam - success)'],
+        'closing': 'Dhanyawadamulu',
+        'cultural': 'Cyberabad, HITEC City, Pharma hub'
+    },
+    'Chennai': {
+        'greeting': 'Vanakkam',
+        'phrases': ['வேலை (velai - work)', 'எதிர்காலம் (ethirkaalam - future)', 'வெற்றி (vetri - success)'],
+        'closing': 'Nandri',
+        'cultural': 'Detroit of India, IT corridor, Cultural capital'
+    },
+    'Pune': {
+        'greeting': 'Namaskar',
+        'phrases': ['काम (kaam - work)', 'यश (yash - success)', 'प्रगती (pragati - progress)'],
+        'closing': 'Dhanyawad',
+        'cultural': 'Oxford of the East, IT hub, Cultural center'
+    },
+    'Kolkata': {
+        'greeting': 'Namaskar',
+        'phrases': ['কাজ (kaaj - work)', 'ভবিষ্যৎ (bhobishyot - future)', 'সাফল্য (shafolyo - success)'],
+        'closing': 'Dhonnobad',
+        'cultural': 'Cultural capital, City of Joy, Educational hub'
+    }
+})
+
+# Languages that switch prompts to bilingual regional elements
+REGIONAL_LANGUAGE_NAMES = ('Kannada', 'Hindi', 'Telugu', 'Tamil', 'Marathi', 'Bengali')
+
+# (bilingual, English-only) prompt fragments per city, built once at import
+REGIONAL_PROMPTS = MappingProxyType({
+    city: (
+        f"{info['greeting']} greeting, incorporate phrases like {', '.join(info['phrases'][:2])}, "
+        f"mention {info['cultural']}, use {info['closing']} for closing",
+        f"Mention {info['cultural']}, use professional English tone"
+    )
+    for city, info in REGIONAL_LANGUAGE_MAP.items()
+})
+
+# Fallback content building blocks, picked by variant number
+FALLBACK_HOOKS = (
+    "🚀 BREAKING: {course} market explodes in {city}!",
+    "💼 {city} professionals: Your {course} moment is NOW!",
+    "⚡ {positions}+ {course} opportunities just opened in {city}",
+    "🎯 {course} boom hits {city} - Are you ready?",
+    "🌟 {city}'s {course} revolution starts with YOU!"
+)
+FALLBACK_VALUE_PROPS = (
+    "Industry-aligned curriculum designed by experts",
+    "Job placement assistance with 500+ hiring partners",
+    "Learn from industry leaders and practitioners",
+    "Hands-on projects with real-world applications",
+    "Career transformation in just 6-12 months"
+)
+FALLBACK_URGENCY = (
+    "Limited seats available - Apply before they're gone!",
+    "Early bird discount ends soon!",
+    "Next batch starts in 2 weeks - Secure your spot!",
+    "Join 50,000+ successful career changers!",
+    "Don't let this opportunity pass you by!"
+)
+
+# Gemini responses cached on disk by prompt hash; identical prompts are answered locally for a day
+LLM_CACHE_DIR = "data/llm_cache"
+LLM_CACHE_TTL = 24 * 60 * 60
+LLM_CACHE_SIZE_LIMIT = 2 * 1024 * 1024 * 1024
+
 # Create FastAPI app
 app = FastAPI(
     title="upGrad AI Marketing Automation",
@@ -44,6 +163,11 @@ app.add_middleware(
 os.makedirs("main idea/static", exist_ok=True)
 app.mount("/static", StaticFiles(directory="main idea/static"), name="static")
 
+def _write_file(path, data):
+    """Write bytes to a file; run in an executor so large images never block the event loop"""
+    with open(path, "wb") as f:
+        f.write(data)
+
 # Pydantic models
 class CampaignRequest(BaseModel):
     course: str
@@ -82,18 +206,30 @@ class RealDataEngine:
         self.stability_api_key = os.getenv("STABILITY_API_KEY")
         self.hiring_data = None
         self.marketing_data = None
+        self._http_session = None
+        self._city_insights = {}
+        self._city_stats = {}
+        self._col_index = {}
+        self._llm_cache = self._open_llm_cache()
         self.load_real_data()
         logger.info(f"AI Engine initialized - Gemini API: {'✅' if self.gemini_api_key else '❌'}")
         logger.info(f"Image Generator - Stability API: {'✅' if self.stability_api_key else '❌'}")
 
     def load_real_data(self):
         """Load real data from XLSX files"""
+        self._city_insights = {}
+        self._city_stats = {}
         try:
             import pandas as pd
 
-            # Load hiring data
+            # Load hiring data (cleaned copy cached as Parquet next to the workbook)
             hiring_file = Path("data/raw/company_hiring_data.xlsx")
-            if hiring_file.exists():
+            hiring_cache = hiring_file.with_suffix('.parquet')
+            if hiring_file.exists() and hiring_cache.exists() and hiring_cache.stat().st_mtime >= hiring_file.stat().st_mtime:
+                # Memory-mapped read: Arrow decodes straight from the page cache
+                self.hiring_data = pd.read_parquet(hiring_cache, engine='pyarrow', memory_map=True)
+                logger.info(f"✅ Loaded hiring data: {len(self.hiring_data)} companies (from {hiring_cache.name})")
+            elif hiring_file.exists():
                 self.hiring_data = pd.read_excel(hiring_file)
 
                 # Clean the data immediately after loading
@@ -101,16 +237,28 @@ class RealDataEngine:
                 if city_col in self.hiring_data.columns:
                     # Remove header rows and invalid entries
                     original_count = len(self.hiring_data)
-                    self.hiring_data = self.hiring_data[self.hiring_data[city_col] != city_col]
-                    self.hiring_data = self.hiring_data[self.hiring_data[city_col].notna()]
-                    self.hiring_data = self.hiring_data[self.hiring_data[city_col].str.len() > 2]
+                    city = self.hiring_data[city_col]
+                    self.hiring_data = self.hiring_data.loc[city.notna() & (city != city_col) & (city.str.len() > 2)]
+                    # Few distinct cities, so store them as a category
+                    self.hiring_data = self.hiring_data.assign(**{city_col: self.hiring_data[city_col].astype('category')})
                     cleaned_count = len(self.hiring_data)
                     logger.info(f"✅ Loaded hiring data: {cleaned_count} companies (cleaned from {original_count})")
                 else:
                     logger.info(f"✅ Loaded hiring data: {len(self.hiring_data)} companies")
+
+                try:
+                    self.hiring_data.to_parquet(hiring_cache, engine='pyarrow', compression='zstd', index=False)
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not cache hiring data as Parquet: {e}")
             else:
                 logger.warning("❌ Hiring data file not found")
 
+            if self.hiring_data is not None:
+                try:
+                    self._city_stats = self._build_city_stats()
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not aggregate hiring data per city: {e}")
+
             # Load marketing data
             marketing_file = Path("data/raw/marketing_automation_data.xlsx")
             if marketing_file.exists():
@@ -199,8 +347,7 @@ class RealDataEngine:
             """
 
         elif campaign_type == 'social':
-            char_limits = {'linkedin': 3000, 'instagram': 2200, 'facebook': 63206, 'twitter': 280}
-            char_limit = char_limits.get(platform, 1000)
+            char_limit = SOCIAL_CHAR_LIMITS.get(platform, 1000)
 
             prompt = f"""
             Create a {platform} {format_type} for upGrad's {course} course targeting {city} professionals.
@@ -288,20 +435,11 @@ class RealDataEngine:
 
         try:
             if self.gemini_api_key:
-                import google.generativeai as genai
-                genai.configure(api_key=self.gemini_api_key)
-                model = genai.GenerativeModel('gemini-1.5-flash')
-
-                response = model.generate_content(prompt)
-                ai_content = response.text
-
-                # Add language variation if requested
+                # Add language variation if requested, in the same call rather than a follow-up translation
                 if language == "Hindi" or language == "Multi":
-                    hindi_prompt = f"Translate key phrases to Hindi and add bilingual elements to: {ai_content[:200]}..."
-                    hindi_response = model.generate_content(hindi_prompt)
-                    ai_content += f"\n\n🇮🇳 {hindi_response.text[:100]}..."
+                    prompt += "\n\nAfter the English content, add a 1-2 sentence bilingual Hindi teaser on its own line, prefixed with '🇮🇳'."
 
-                return ai_content
+                return await self._gemini_generate(prompt)
 
             else:
                 # Fallback to enhanced template-based generation
@@ -311,38 +449,66 @@ class RealDataEngine:
             logger.error(f"AI content generation failed: {e}")
             return self._generate_fallback_content(course, city, positions, companies, tone_scale, variant_number, campaign_type)
 
-    def _generate_fallback_content(self, course, city, positions, companies, tone_scale, variant_number, campaign_type):
-        """Enhanced fallback content generation with more variety"""
+    def _get_http_session(self):
+        """Shared aiohttp session so API calls reuse pooled keep-alive connections"""
+        import aiohttp
 
-        # Dynamic content templates with more variety
-        hooks = [
-            f"🚀 BREAKING: {course} market explodes in {city}!",
-            f"💼 {city} professionals: Your {course} moment is NOW!",
-            f"⚡ {positions}+ {course} opportunities just opened in {city}",
-            f"🎯 {course} boom hits {city} - Are you ready?",
-            f"🌟 {city}'s {course} revolution starts with YOU!"
-        ]
+        if self._http_session is None or self._http_session.closed:
+            self._http_session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._http_session
 
-        value_props = [
-            "Industry-aligned curriculum designed by experts",
-            "Job placement assistance with 500+ hiring partners",
-            "Learn from industry leaders and practitioners",
-            "Hands-on projects with real-world applications",
-            "Career transformation in just 6-12 months"
-        ]
+    async def close(self):
+        """Close the shared HTTP session"""
+        if self._http_session is not None and not self._http_session.closed:
+            await self._http_session.close()
 
-        urgency_elements = [
-            "Limited seats available - Apply before they're gone!",
-            "Early bird discount ends soon!",
-            "Next batch starts in 2 weeks - Secure your spot!",
-            "Join 50,000+ successful career changers!",
-            "Don't let this opportunity pass you by!"
-        ]
+    def _open_llm_cache(self):
+        """Open the disk cache of Gemini responses, if diskcache is installed"""
+        if Cache is None:
+            return None
+        try:
+            return Cache(LLM_CACHE_DIR, size_limit=LLM_CACHE_SIZE_LIMIT)
+        except Exception as e:
+            logger.error(f"Error opening LLM cache at {LLM_CACHE_DIR}: {e}")
+            return None
 
-        # Select elements based on variant number
-        hook = hooks[variant_number % len(hooks)]
-        value_prop = value_props[variant_number % len(value_props)]
-        urgency = urgency_elements[variant_number % len(urgency_elements)]
+    async def _gemini_generate(self, prompt):
+        """Generate text with Gemini, serving repeated prompts from the disk cache"""
+        key = hashlib.blake2b(prompt.encode('utf-8'), digest_size=16).hexdigest()
+        if self._llm_cache is not None:
+            cached = await asyncio.to_thread(self._llm_cache.get, key)
+            if cached is not None:
+                return cached
+
+        text = await self._gemini_request(prompt)
+        if self._llm_cache is not None:
+            await asyncio.to_thread(self._llm_cache.set, key, text, expire=LLM_CACHE_TTL)
+        return text
+
+    async def _gemini_request(self, prompt):
+        """Call the Gemini REST API without blocking the event loop"""
+        session = self._get_http_session()
+        async with session.post(
+            GEMINI_API_URL,
+            params={"key": self.gemini_api_key},
+            json={"contents": [{"parts": [{"text": prompt}]}]}
+        ) as response:
+            if response.status != 200:
+                error_text = await response.text()
+                raise RuntimeError(f"Gemini API error: {response.status} - {error_text}")
+            data = await response.json()
+        return data["candidates"][0]["content"]["parts"][0]["text"]
+
+    def _generate_fallback_content(self, course, city, positions, companies, tone_scale, variant_number, campaign_type):
+        """Enhanced fallback content generation with more variety"""
+
+        # Select elements based on variant number; only the chosen hook is formatted
+        hook = FALLBACK_HOOKS[variant_number % len(FALLBACK_HOOKS)].format(course=course, city=city, positions=positions)
+        value_prop = FALLBACK_VALUE_PROPS[variant_number % len(FALLBACK_VALUE_PROPS)]
+        urgency = FALLBACK_URGENCY[variant_number % len(FALLBACK_URGENCY)]
 
         if tone_scale <= 3:
             content = f"{hook}\n\nDear Professional,\n\nWe're excited to share that {companies} leading companies in {city} are actively seeking {course} professionals. With {positions}+ positions available, this represents a significant career opportunity.\n\n✅ {value_prop}\n✅ Comprehensive skill development program\n✅ Industry-recognized certification\n\nWe invite you to explore how upGrad can help you capitalize on this market demand.\n\nBest regards,\nupGrad Team"
@@ -356,111 +522,91 @@ class RealDataEngine:
     def _get_regional_language_elements(self, city, language):
         """Get regional language elements for the city"""
 
-        regional_map = {
-            'Bangalore': {
-                'greeting': 'Namaskara',
-                'phrases': ['ಕೆಲಸ (kelasa - work)', 'ಭವಿಷ್ಯ (bhavishya - future)', 'ಯಶಸ್ಸು (yashassu - success)'],
-                'closing': 'Dhanyawadagalu',
-                'cultural': 'Silicon Valley of India, Tech hub, IT capital'
-            },
-            'Mumbai': {
-                'greeting': 'Namaste',
-                'phrases': ['काम (kaam - work)', 'सफलता (safalta - success)', 'भविष्य (bhavishya - future)'],
-                'closing': 'Dhanyawad',
-                'cultural': 'Financial capital, Bollywood, Dreams city'
-            },
-            'Delhi NCR': {
-                'greeting': 'Namaste',
-                'phrases': ['नौकरी (naukri - job)', 'कैरियर (career)', 'तरक्की (tarakki - progress)'],
-                'closing': 'Dhanyawad',
-                'cultural': 'Capital region, Government hub, Corporate center'
-            },
-            'Hyderabad': {
-                'greeting': 'Namaste',
-                'phrases': ['పని (pani - work)', 'భవిష్యత్తు (bhavishyattu - future)', 'విజయం (vijayam - success)'],
-                'closing': 'Dhanyawadamulu',
-                'cultural': 'Cyberabad, HITEC City, Pharma hub'
-            },
-            'Chennai': {
-                'greeting': 'Vanakkam',
-                'phrases': ['வேலை (velai - work)', 'எதிர்காலம் (ethirkaalam - future)', 'வெற்றி (vetri - success)'],
-                'closing': 'Nandri',
-                'cultural': 'Detroit of India, IT corridor, Cultural capital'
-            },
-            'Pune': {
-                'greeting': 'Namaskar',
-                'phrases': ['काम (kaam - work)', 'यश (yash - success)', 'प्रगती (pragati - progress)'],
-                'closing': 'Dhanyawad',
-                'cultural': 'Oxford of the East, IT hub, Cultural center'
-            },
-            'Kolkata': {
-                'greeting': 'Namaskar',
-                'phrases': ['কাজ (kaaj - work)', 'ভবিষ্যৎ (bhobishyot - future)', 'সাফল্য (shafolyo - success)'],
-                'closing': 'Dhonnobad',
-                'cultural': 'Cultural capital, City of Joy, Educational hub'
-            }
-        }
+        prompts = REGIONAL_PROMPTS.get(city, REGIONAL_PROMPTS['Mumbai'])  # Default to Mumbai
+        bilingual = 'English' in language and any(lang in language for lang in REGIONAL_LANGUAGE_NAMES)
+        return prompts[0] if bilingual else prompts[1]
 
-        city_info = regional_map.get(city, regional_map.get('Mumbai'))  # Default to Mumbai
+    def get_city_insights(self, city):
+        """Get real insights for a city, computed once per city and served from memory afterwards"""
+        insights = self._city_insights.get(city)
+        if insights is None:
+            insights = self._city_insights[city] = self._compute_city_insights(city)
+        return {**insights, "top_skills": list(insights["top_skills"])}
+
+    def _build_city_stats(self):
+        """Aggregate the hiring data per city once, so insights never rescan the rows"""
+        df = self.hiring_data
+
+        # Lowercased column names, built once (the first column wins on case-only duplicates)
+        self._col_index = {}
+        for col in df.columns:
+            self._col_index.setdefault(str(col).lower(), col)
+
+        city_col = self._col_index.get('city')
+        if city_col is None:
+            return {}
+        positions_col = next((col for name, col in self._col_index.items() if 'position' in name), None)
+        salary_col = next((col for name, col in self._col_index.items() if 'salary' in name), None)
+
+        # observed=True keeps the categorical city column from expanding to unused categories
+        grouped = df.groupby(city_col, observed=True, sort=False)
+        companies = grouped.size()
+        positions = grouped[positions_col].sum() if positions_col else None
+
+        # Salary frequencies per city, so the mode can be taken over any set of matching cities
+        salaries = {}
+        if salary_col:
+            for (name, salary), count in df.groupby([city_col, salary_col], observed=True, sort=False).size().items():
+                salaries.setdefault(name, {})[salary] = int(count)
 
-        if 'English' in language and any(lang in language for lang in ['Kannada', 'Hindi', 'Telugu', 'Tamil', 'Marathi', 'Bengali']):
-            return f"{city_info['greeting']} greeting, incorporate phrases like {', '.join(city_info['phrases'][:2])}, mention {city_info['cultural']}, use {city_info['closing']} for closing"
-        else:
-            return f"Mention {city_info['cultural']}, use professional English tone"
+        return {
+            name: {
+                "companies": int(count),
+                "positions": positions[name] if positions is not None else None,
+                "salaries": salaries.get(name, {})
+            }
+            for name, count in companies.items()
+        }
 
-    def get_city_insights(self, city):
-        """Get real insights for a city from the data"""
-        if self.hiring_data is not None:
+    def _compute_city_insights(self, city):
+        """Compute insights for a city from the per-city hiring aggregates"""
+        city = CITY_ALIASES.get(city.lower(), city)
+        if self._city_stats:
             try:
-                # Clean the data first - remove header rows and invalid entries
-                clean_data = self.hiring_data.copy()
-
-                # Find the correct city column name (case insensitive)
-                city_col = None
-                for col in clean_data.columns:
-                    if col.lower() == 'city':
-                        city_col = col
-                        break
-
-                if city_col is None:
-                    raise Exception("No city column found in data")
-
-                # Remove rows where city column contains the column name itself (header rows)
-                clean_data = clean_data[clean_data[city_col] != city_col]
-                clean_data = clean_data[clean_data[city_col].notna()]
-                clean_data = clean_data[clean_data[city_col].str.len() > 2]  # Valid city names
-
-                # Filter data for the specific city
-                city_data = clean_data[clean_data[city_col].str.contains(city, case=False, na=False)]
-
-                if len(city_data) > 0:
-                    # Find positions column (case insensitive)
-                    positions_col = None
-                    for col in city_data.columns:
-                        if 'position' in col.lower():
-                            positions_col = col
-                            break
-
-                    positions = int(city_data[positions_col].sum()) if positions_col and positions_col in city_data.columns else len(city_data) * 50
-                    companies = len(city_data)
-
-                    # Calculate average salary if available
-                    avg_salary = "₹12-18 LPA"  # Default
-                    salary_col = None
-                    for col in city_data.columns:
-                        if 'salary' in col.lower():
-                            salary_col = col
-                            break
+                # Cities match by case-insensitive substring over the distinct city names
+                needle = city.lower()
+                matched = [stats for name, stats in self._city_stats.items() if needle in str(name).lower()]
+
+                # Otherwise take the closest spelling from the (small) city vocabulary
+                if not matched and process is not None:
+                    best = process.extractOne(
+                        city, list(self._city_stats), scorer=fuzz.ratio,
+                        processor=fuzz_utils.default_process, score_cutoff=CITY_MATCH_SCORE_CUTOFF
+                    )
+                    if best is not None:
+                        matched = [self._city_stats[best[0]]]
+
+                if matched:
+                    companies = sum(stats["companies"] for stats in matched)
+                    if matched[0]["positions"] is not None:
+                        positions = int(sum(stats["positions"] for stats in matched))
+                    else:
+                        positions = companies * 50
 
-                    if salary_col and salary_col in city_data.columns:
-                        salary_mode = city_data[salary_col].mode()
-                        avg_salary = salary_mode.iloc[0] if len(salary_mode) > 0 else "₹12-18 LPA"
+                    # Most common salary band across the matching cities (smallest value on ties, like Series.mode)
+                    avg_salary = "₹12-18 LPA"  # Default
+                    salary_counts = Counter()
+                    for stats in matched:
+                        salary_counts.update(stats["salaries"])
+                    if salary_counts:
+                        top_count = max(salary_counts.values())
+                        avg_salary = min(salary for salary, count in salary_counts.items() if count == top_count)
 
                     return {
                         "positions_available": positions,
                         "companies_hiring": companies,
                         "avg_salary": avg_salary,
-                        "top_skills": self.get_top_skills_for_city(city_data),
+                        "top_skills": self.get_top_skills_for_city(self.hiring_data),
                         "growth_rate": "+15% YoY"  # Could be calculated from data
                     }
             except Exception as e:
@@ -580,31 +726,28 @@ class RealDataEngine:
                 "steps": 30,
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, headers=headers, json=body) as response:
-                    if response.status == 200:
-                        data = await response.json()
+            # Shared keep-alive session; image generation keeps aiohttp's default 5 minute limit
+            session = self._get_http_session()
+            async with session.post(url, headers=headers, json=body, timeout=aiohttp.ClientTimeout(total=300)) as response:
+                if response.status == 200:
+                    data = await response.json()
 
-                        # Save the generated image
-                        for i, image in enumerate(data["artifacts"]):
-                            image_data = base64.b64decode(image["base64"])
+                    # Save the generated image
+                    for i, image in enumerate(data["artifacts"]):
+                        image_data = base64.b64decode(image["base64"])
 
-                            # Create static directory if it doesn't exist
-                            os.makedirs("main idea/static", exist_ok=True)
+                        # Generate unique filename (the static directory is created at startup)
+                        filename = f"generated_{uuid.uuid4().hex[:8]}.png"
+                        filepath = f"main idea/static/{filename}"
 
-                            # Generate unique filename
-                            filename = f"generated_{uuid.uuid4().hex[:8]}.png"
-                            filepath = f"main idea/static/{filename}"
+                        await asyncio.get_running_loop().run_in_executor(None, _write_file, filepath, image_data)
 
-                            with open(filepath, "wb") as f:
-                                f.write(image_data)
-
-                            # Return the URL path
-                            return f"/static/{filename}"
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Stability AI API error: {response.status} - {error_text}")
-                        return None
+                        # Return the URL path
+                        return f"/static/{filename}"
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Stability AI API error: {response.status} - {error_text}")
+                    return None
 
         except Exception as e:
             logger.error(f"Stability AI generation error: {e}")
@@ -616,11 +759,11 @@ class RealDataEngine:
         # Create a more sophisticated placeholder
         width, height = size.split('x')
 
-        # Use a service that can generate text overlays
+        # Use a service that can generate text overlays (crc32 keeps the picsum seed stable across restarts)
         placeholder_services = [
             f"https://via.placeholder.com/{width}x{height}/3b82f6/ffffff?text=upGrad+{course.replace('/', '%2F')}+{city}",
             f"https://dummyimage.com/{width}x{height}/3b82f6/ffffff&text=upGrad+{course}+Campaign",
-            f"https://picsum.photos/{width}/{height}?random={hash(f'{course}{city}{style}') % 1000}"
+            f"https://picsum.photos/{width}/{height}?random={zlib.crc32(f'{course}|{city}|{style}'.encode('utf-8')) % 1000}"
         ]
 
         # Select based on style
@@ -638,586 +781,28 @@ class RealDataEngine:
 # Initialize services with real data
 data_engine = RealDataEngine()
 
-# Routes
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Serve the main dashboard with cache-busting"""
-    from fastapi import Response
+@app.on_event("shutdown")
+async def close_data_engine():
+    """Release pooled HTTP connections on shutdown"""
+    await data_engine.close()
+
+# Dashboard stylesheet, read once and versioned by content hash so browsers can cache it for good
+DASHBOARD_CSS_BYTES = (Path(__file__).resolve().parent / "frontend" / "static" / "css" / "dashboard.css").read_bytes()
+DASHBOARD_CSS_URL = f"/assets/dashboard.css?v={hashlib.blake2b(DASHBOARD_CSS_BYTES, digest_size=6).hexdigest()}"
 
-    # Generate the HTML content directly (no template file needed)
-    html_content = """
+# Dashboard page, served straight from the module (no template file needed)
+DASHBOARD_HTML = """
             <!DOCTYPE html>
             <html>
             <head>
                 <title>upGrad AI Marketing Automation</title>
                 <meta charset="UTF-8">
                 <meta name="viewport" content="width=device-width, initial-scale=1.0">
-                <style>
-                    @import url('https://fonts.googleapis.com/css2?family=Poppins:wght@300;400;500;600;700;800;900&family=Inter:wght@300;400;500;600;700;800;900&display=swap');
-
-                    * { margin: 0; padding: 0; box-sizing: border-box; }
-
-                    body {
-                        font-family: 'Poppins', 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 25%, #f093fb 50%, #f5576c 75%, #4facfe 100%);
-                        background-size: 400% 400%;
-                        animation: gradientShift 15s ease infinite;
-                        color: #ffffff;
-                        line-height: 1.6;
-                        overflow-x: hidden;
-                        margin: 0;
-                        padding: 0;
-                        min-height: 100vh;
-                        font-weight: 400;
-                    }
-
-                    @keyframes gradientShift {
-                        0% { background-position: 0% 50%; }
-                        50% { background-position: 100% 50%; }
-                        100% { background-position: 0% 50%; }
-                    }
-
-                    .dashboard {
-                        display: grid;
-                        grid-template-columns: 420px 1fr 380px;
-                        min-height: 100vh;
-                        gap: 8px;
-                        padding: 8px;
-                        background: rgba(0, 0, 0, 0.1);
-                    }
-
-                    .sidebar, .main-content, .system-panel {
-                        background: rgba(255, 255, 255, 0.95);
-                        backdrop-filter: blur(20px);
-                        padding: 32px;
-                        overflow-y: auto;
-                        border-radius: 24px;
-                        box-shadow:
-                            0 20px 60px rgba(0, 0, 0, 0.3),
-                            inset 0 1px 0 rgba(255, 255, 255, 0.8);
-                        border: 2px solid rgba(255, 255, 255, 0.3);
-                        color: #2d3748;
-                    }
-
-                    .header {
-                        display: flex;
-                        align-items: center;
-                        gap: 20px;
-                        margin-bottom: 40px;
-                        padding: 28px;
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-                        border-radius: 24px;
-                        box-shadow:
-                            0 15px 40px rgba(102, 126, 234, 0.4),
-                            inset 0 2px 0 rgba(255, 255, 255, 0.3);
-                        position: relative;
-                        overflow: hidden;
-                        border: 2px solid rgba(255, 255, 255, 0.2);
-                    }
-
-                    .header::before {
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        left: -100%;
-                        width: 100%;
-                        height: 100%;
-                        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.2), transparent);
-                        animation: headerShine 3s infinite;
-                    }
-
-                    @keyframes headerShine {
-                        0% { left: -100%; }
-                        100% { left: 100%; }
-                    }
-
-                    .logo {
-                        color: #ffffff;
-                        font-size: 28px;
-                        text-shadow: 0 0 20px rgba(255, 255, 255, 0.5);
-                        z-index: 1;
-                    }
-                    .title {
-                        font-size: 20px;
-                        font-weight: 800;
-                        color: #ffffff;
-                        text-shadow: 0 2px 4px rgba(0, 0, 0, 0.3);
-                        z-index: 1;
-                    }
-
-                    .section {
-                        background: rgba(255, 255, 255, 0.9);
-                        backdrop-filter: blur(20px);
-                        border-radius: 24px;
-                        padding: 32px;
-                        margin-bottom: 32px;
-                        border: 2px solid rgba(102, 126, 234, 0.2);
-                        box-shadow:
-                            0 20px 40px rgba(0, 0, 0, 0.1),
-                            inset 0 2px 0 rgba(255, 255, 255, 0.8);
-                        position: relative;
-                        overflow: hidden;
-                    }
-
-                    .content-type-selector {
-                        display: flex;
-                        gap: 8px;
-                        margin-bottom: 32px;
-                        background: rgba(255, 255, 255, 0.8);
-                        padding: 8px;
-                        border-radius: 20px;
-                        backdrop-filter: blur(20px);
-                        border: 2px solid rgba(102, 126, 234, 0.2);
-                    }
-
-                    .type-btn {
-                        flex: 1;
-                        padding: 16px 20px;
-                        border: none;
-                        border-radius: 16px;
-                        font-weight: 600;
-                        font-size: 14px;
-                        cursor: pointer;
-                        transition: all 0.3s ease;
-                        background: transparent;
-                        color: #4a5568;
-                        font-family: 'Poppins', sans-serif;
-                    }
-
-                    .type-btn:hover {
-                        background: rgba(102, 126, 234, 0.1);
-                        color: #667eea;
-                        transform: translateY(-2px);
-                    }
-
-                    .type-btn.active {
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                        color: #ffffff;
-                        box-shadow: 0 8px 25px rgba(102, 126, 234, 0.4);
-                    }
-
-                    .content-section {
-                        display: none;
-                    }
-
-                    .content-section.active {
-                        display: block;
-                    }
-
-                    .section::before {
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        left: 0;
-                        right: 0;
-                        height: 3px;
-                        background: linear-gradient(90deg, #ff6b6b, #4ecdc4, #45b7d1, #ff6b6b);
-                        background-size: 300% 100%;
-                        animation: gradientMove 4s ease infinite;
-                    }
-
-                    @keyframes gradientMove {
-                        0%, 100% { background-position: 0% 50%; }
-                        50% { background-position: 100% 50%; }
-                    }
-
-                    .section-header {
-                        display: flex;
-                        align-items: center;
-                        gap: 16px;
-                        margin-bottom: 24px;
-                        color: #ff6b6b;
-                        font-weight: 800;
-                        font-size: 18px;
-                        text-shadow: 0 0 10px rgba(255, 107, 107, 0.3);
-                    }
-
-                    .form-group {
-                        margin-bottom: 15px;
-                    }
-
-                    .form-label {
-                        display: block;
-                        margin-bottom: 5px;
-                        font-size: 14px;
-                        color: #a0aec0;
-                    }
-
-                    select, input, textarea {
-                        width: 100%;
-                        padding: 16px 20px;
-                        background: rgba(255, 255, 255, 0.9);
-                        border: 2px solid rgba(102, 126, 234, 0.2);
-                        border-radius: 16px;
-                        color: #2d3748;
-                        font-size: 15px;
-                        font-weight: 500;
-                        transition: all 0.4s ease;
-                        box-shadow:
-                            0 4px 15px rgba(0, 0, 0, 0.1),
-                            inset 0 2px 0 rgba(255, 255, 255, 0.8);
-                        font-family: 'Poppins', sans-serif;
-                    }
-
-                    select:focus, input:focus, textarea:focus {
-                        outline: none;
-                        border-color: #667eea;
-                        box-shadow:
-                            0 0 0 4px rgba(102, 126, 234, 0.2),
-                            0 8px 25px rgba(102, 126, 234, 0.3);
-                        background: rgba(255, 255, 255, 1);
-                        transform: translateY(-2px);
-                    }
-
-                    .btn {
-                        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                        color: #ffffff;
-                        border: none;
-                        padding: 18px 32px;
-                        border-radius: 16px;
-                        font-weight: 700;
-                        font-size: 15px;
-                        cursor: pointer;
-                        transition: all 0.4s ease;
-                        width: 100%;
-                        margin-bottom: 20px;
-                        box-shadow:
-                            0 12px 30px rgba(102, 126, 234, 0.4),
-                            inset 0 2px 0 rgba(255, 255, 255, 0.3);
-                        text-transform: uppercase;
-                        letter-spacing: 1px;
-                        position: relative;
-                        overflow: hidden;
-                        font-family: 'Poppins', sans-serif;
-                    }
-
-                    .btn.primary {
-                        background: linear-gradient(135deg, #f093fb 0%, #f5576c 100%);
-                        box-shadow:
-                            0 12px 30px rgba(240, 147, 251, 0.4),
-                            inset 0 2px 0 rgba(255, 255, 255, 0.3);
-                    }
-
-                    .btn::before {
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        left: -100%;
-                        width: 100%;
-                        height: 100%;
-                        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.3), transparent);
-                        transition: left 0.5s;
-                    }
-
-                    .btn:hover::before {
-                        left: 100%;
-                    }
-
-                    .btn:hover {
-                        background: linear-gradient(135deg, #ff5252 0%, #26c6da 50%, #42a5f5 100%);
-                        transform: translateY(-3px);
-                        box-shadow:
-                            0 12px 35px rgba(255, 107, 107, 0.5),
-                            inset 0 1px 0 rgba(255, 255, 255, 0.3);
-                    }
-                    .btn:disabled {
-                        opacity: 0.5;
-                        cursor: not-allowed;
-                        transform: none;
-                        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.2);
-                    }
-
-                    .btn-secondary {
-                        background: #718096;
-                        color: #e2e8f0;
-                    }
-
-                    .btn-secondary:hover { background: #4a5568; }
-
-                    .city-grid {
-                        display: grid;
-                        grid-template-columns: 1fr 1fr;
-                        gap: 10px;
-                        margin-top: 10px;
-                    }
-
-                    .city-option {
-                        padding: 14px 18px;
-                        background: linear-gradient(145deg, #2a2a3e 0%, #1e1e2e 100%);
-                        border: 2px solid rgba(255, 107, 107, 0.3);
-                        border-radius: 12px;
-                        cursor: pointer;
-                        text-align: center;
-                        font-size: 14px;
-                        font-weight: 700;
-                        transition: all 0.4s ease;
-                        position: relative;
-                        overflow: hidden;
-                        color: #ffffff;
-                        box-shadow: 0 4px 15px rgba(0, 0, 0, 0.2);
-                    }
-
-                    .city-option::before {
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        left: -100%;
-                        width: 100%;
-                        height: 100%;
-                        background: linear-gradient(90deg, transparent, rgba(78, 205, 196, 0.3), transparent);
-                        transition: left 0.6s;
-                    }
-
-                    .city-option:hover::before {
-                        left: 100%;
-                    }
-
-                    .city-option:hover, .city-option.selected {
-                        background: linear-gradient(135deg, #ff6b6b 0%, #4ecdc4 100%);
-                        color: #ffffff;
-                        border-color: #4ecdc4;
-                        transform: translateY(-3px);
-                        box-shadow:
-                            0 8px 25px rgba(78, 205, 196, 0.4),
-                            inset 0 1px 0 rgba(255, 255, 255, 0.2);
-                    }
-
-                    .slider-container {
-                        margin: 15px 0;
-                    }
-
-                    .slider {
-                        width: 100%;
-                        height: 6px;
-                        border-radius: 3px;
-                        background: #4a5568;
-                        outline: none;
-                        -webkit-appearance: none;
-                    }
-
-                    .slider::-webkit-slider-thumb {
-                        -webkit-appearance: none;
-                        appearance: none;
-                        width: 18px;
-                        height: 18px;
-                        border-radius: 50%;
-                        background: #4fd1c7;
-                        cursor: pointer;
-                    }
-
-                    .size-options {
-                        display: grid;
-                        grid-template-columns: repeat(3, 1fr);
-                        gap: 8px;
-                        margin-top: 10px;
-                    }
-
-                    .size-option {
-                        padding: 8px;
-                        background: #4a5568;
-                        border: 1px solid #718096;
-                        border-radius: 4px;
-                        cursor: pointer;
-                        text-align: center;
-                        font-size: 11px;
-                        transition: all 0.2s;
-                    }
-
-                    .size-option:hover, .size-option.selected {
-                        background: #4fd1c7;
-                        color: #1a202c;
-                        border-color: #4fd1c7;
-                    }
-
-                    .results-area {
-                        background: linear-gradient(145deg, #2a2a3e 0%, #1e1e2e 100%);
-                        border-radius: 20px;
-                        padding: 32px;
-                        min-height: 400px;
-                        display: flex;
-                        align-items: center;
-                        justify-content: center;
-                        color: #ffffff;
-                        text-align: center;
-                        border: 2px solid rgba(78, 205, 196, 0.2);
-                        box-shadow:
-                            0 15px 40px rgba(0, 0, 0, 0.5),
-                            inset 0 1px 0 rgba(255, 255, 255, 0.1);
-                        position: relative;
-                        overflow: hidden;
-                    }
-
-                    .image-display {
-                        background: linear-gradient(145deg, #2a2a3e 0%, #1e1e2e 100%);
-                        border-radius: 16px;
-                        padding: 20px;
-                        border: 2px solid rgba(255, 107, 107, 0.3);
-                        box-shadow: 0 10px 30px rgba(0, 0, 0, 0.3);
-                        text-align: center;
-                        position: relative;
-                        overflow: hidden;
-                    }
-
-                    .image-display img {
-                        max-width: 100%;
-                        height: auto;
-                        border-radius: 12px;
-                        box-shadow: 0 8px 25px rgba(0, 0, 0, 0.4);
-                        transition: transform 0.3s ease;
-                    }
-
-                    .image-display img:hover {
-                        transform: scale(1.02);
-                    }
-
-                    .image-actions {
-                        margin-top: 16px;
-                        display: flex;
-                        gap: 12px;
-                        justify-content: center;
-                        flex-wrap: wrap;
-                    }
-
-                    .image-btn {
-                        background: linear-gradient(135deg, #4ecdc4 0%, #45b7d1 100%);
-                        color: #ffffff;
-                        border: none;
-                        padding: 10px 20px;
-                        border-radius: 10px;
-                        font-weight: 600;
-                        cursor: pointer;
-                        transition: all 0.3s ease;
-                        font-size: 13px;
-                        box-shadow: 0 4px 15px rgba(78, 205, 196, 0.3);
-                    }
-
-                    .image-btn:hover {
-                        background: linear-gradient(135deg, #26c6da 0%, #42a5f5 100%);
-                        transform: translateY(-2px);
-                        box-shadow: 0 6px 20px rgba(78, 205, 196, 0.4);
-                    }
-
-                    .loading-spinner {
-                        width: 50px;
-                        height: 50px;
-                        border: 4px solid rgba(78, 205, 196, 0.2);
-                        border-top: 4px solid #4ecdc4;
-                        border-radius: 50%;
-                        animation: spin 1s linear infinite;
-                        margin: 0 auto;
-                    }
-
-                    @keyframes spin {
-                        0% { transform: rotate(0deg); }
-                        100% { transform: rotate(360deg); }
-                    }
-
-                    .results-area::before {
-                        content: '';
-                        position: absolute;
-                        top: 0;
-                        left: 0;
-                        right: 0;
-                        height: 2px;
-                        background: linear-gradient(90deg, #3b82f6, #8b5cf6, #3b82f6);
-                        background-size: 200% 100%;
-                        animation: shimmer 2s infinite;
-                    }
-
-                    @keyframes shimmer {
-                        0% { background-position: -200% 0; }
-                        100% { background-position: 200% 0; }
-                    }
-
-                    .loading-spinner {
-                        width: 50px;
-                        height: 50px;
-                        border: 4px solid rgba(59, 130, 246, 0.2);
-                        border-top: 4px solid #3b82f6;
-                        border-radius: 50%;
-                        animation: spin 1s linear infinite;
-                        margin: 0 auto 20px;
-                    }
-
-                    @keyframes spin {
-                        0% { transform: rotate(0deg); }
-                        100% { transform: rotate(360deg); }
-                    }
-
-                    .result-content {
-                        width: 100%;
-                    }
-
-                    .result-tabs {
-                        display: flex;
-                        gap: 10px;
-                        margin-bottom: 20px;
-                        border-bottom: 1px solid #4a5568;
-                    }
-
-                    .tab {
-                        padding: 10px 15px;
-                        cursor: pointer;
-                        border-bottom: 2px solid transparent;
-                        transition: all 0.2s;
-                    }
-
-                    .tab.active {
-                        color: #4fd1c7;
-                        border-bottom-color: #4fd1c7;
-                    }
-
-                    .system-stats {
-                        display: grid;
-                        gap: 15px;
-                    }
-
-                    .stat-item {
-                        background: #2d3748;
-                        padding: 15px;
-                        border-radius: 6px;
-                        border-left: 3px solid #4fd1c7;
-                    }
-
-                    .stat-label {
-                        font-size: 12px;
-                        color: #a0aec0;
-                        margin-bottom: 5px;
-                    }
-
-                    .stat-value {
-                        font-size: 18px;
-                        font-weight: 600;
-                        color: #4fd1c7;
-                    }
-
-                    .component-status {
-                        display: flex;
-                        align-items: center;
-                        justify-content: space-between;
-                        padding: 10px;
-                        background: #2d3748;
-                        border-radius: 6px;
-                        margin-bottom: 10px;
-                    }
-
-                    .status-indicator {
-                        width: 8px;
-                        height: 8px;
-                        border-radius: 50%;
-                        background: #48bb78;
-                    }
-
-                    .status-indicator.warning { background: #ed8936; }
-                    .status-indicator.error { background: #f56565; }
-
-                    @media (max-width: 1200px) {
-                        .dashboard {
-                            grid-template-columns: 1fr;
-                            grid-template-rows: auto auto auto;
-                        }
-                    }
-                </style>
+                <link rel="preconnect" href="https://fonts.googleapis.com">
+                <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+                <link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;500;600;700;800&family=Inter:wght@300..900&display=swap" media="print" onload="this.media='all'">
+                <noscript><link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Poppins:wght@400;500;600;700;800&family=Inter:wght@300..900&display=swap"></noscript>
+                <link rel="stylesheet" href="{DASHBOARD_CSS_URL}">
             </head>
             <body>
                 <div class="dashboard">
@@ -2308,12 +1893,31 @@ async def root():
             </html>
             """
 
-    # Create response with cache-busting headers
-    response = HTMLResponse(content=html_content, status_code=200)
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
-    return response
+# Dashboard bytes and validator, computed once at import
+DASHBOARD_HTML_BYTES = DASHBOARD_HTML.replace("{DASHBOARD_CSS_URL}", DASHBOARD_CSS_URL).encode("utf-8")
+DASHBOARD_ETAG = f'"{hashlib.blake2b(DASHBOARD_HTML_BYTES, digest_size=16).hexdigest()}"'
+
+# Browsers revalidate on every load, so an unchanged page costs a bodiless 304
+DASHBOARD_HEADERS = MappingProxyType({"Cache-Control": "no-cache", "ETag": DASHBOARD_ETAG})
+
+# Routes
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Serve the main dashboard, answering 304 when the browser already has this version"""
+    # The quoted tag also matches weak (W/) or listed validators
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match == "*" or DASHBOARD_ETAG in if_none_match:
+        return Response(status_code=304, headers=dict(DASHBOARD_HEADERS))
+    return Response(content=DASHBOARD_HTML_BYTES, media_type="text/html", headers=dict(DASHBOARD_HEADERS))
+
+@app.get("/assets/dashboard.css")
+async def dashboard_css():
+    """Serve the dashboard stylesheet; the URL changes with its content, so it never needs revalidating"""
+    return Response(
+        content=DASHBOARD_CSS_BYTES,
+        media_type="text/css",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
 
 @app.get("/api/health")
 async def health_check():
@@ -0,0 +1,44 @@
+"""
+Parsing tests for the AI content engine
+Run with: python -m pytest test_ai_engine.py
+"""
+
+import pytest
+
+from backend.ai_engine import AIContentGenerator, SECTION_RE
+
+@pytest.fixture
+def generator():
+    # Parsing uses no instance state, so skip __init__ (Gemini setup, disk cache)
+    return AIContentGenerator.__new__(AIContentGenerator)
+
+@pytest.mark.parametrize("response", [
+    "SUBJECT: Hyderabad AI jobs\nBODY: Join now\nSOCIAL: #upGrad\nCTA: Enroll\nBENEFITS: A | B | C",
+    "**SUBJECT:** Hyderabad AI jobs\n**BODY:** Join now\n**SOCIAL:** #upGrad\n**CTA:** Enroll\n**BENEFITS:** A | B | C",
+    "**SUBJECT**: Hyderabad AI jobs\n**BODY**: Join now\n**SOCIAL**: #upGrad\n**CTA**: Enroll\n**BENEFITS**: A | B | C",
+    "1. SUBJECT: Hyderabad AI jobs\n2. BODY: Join now\n3. SOCIAL: #upGrad\n4. CTA: Enroll\n5. BENEFITS: A | B | C",
+    "- SUBJECT: Hyderabad AI jobs\n- BODY: Join now\n- SOCIAL: #upGrad\n- CTA: Enroll\n- BENEFITS: A | B | C",
+    "## SUBJECT: Hyderabad AI jobs\n## BODY: Join now\n## SOCIAL: #upGrad\n## CTA: Enroll\n## BENEFITS: A | B | C",
+])
+def test_parse_sections_with_markdown_and_list_prefixes(generator, response):
+    parsed = generator._parse_ai_response(response, "AI/ML", "Hyderabad")
+
+    assert parsed == {
+        'email_subject': "Hyderabad AI jobs",
+        'email_body': "Join now",
+        'social_post': "#upGrad",
+        'call_to_action': "Enroll",
+        'key_benefits': ["A", "B", "C"]
+    }
+
+def test_multiline_body_runs_until_next_section():
+    response = "SUBJECT: Hi\nBODY: First line\n\nSecond line\n**CTA:** Enroll"
+    sections = {match.group(1).upper(): match.group(2).strip() for match in SECTION_RE.finditer(response)}
+
+    assert sections == {'SUBJECT': "Hi", 'BODY': "First line\n\nSecond line", 'CTA': "Enroll"}
+
+def test_missing_sections_use_defaults(generator):
+    parsed = generator._parse_ai_response("Here is your campaign!", "Data Science", "Pune")
+
+    assert parsed['email_subject'] == "Pune Data Science Opportunity - Transform Your Career!"[:60]
+    assert parsed['key_benefits'] == ["Career advancement", "Salary increase", "Industry recognition"]